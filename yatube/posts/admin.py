@@ -1,20 +1,92 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from .models import Comment, Follow, Group, Post
+from .search import search_posts
+
+
+class ApproximateCountPaginator(Paginator):
+    """Paginator whose count stays cheap on huge tables.
+
+    Unfiltered lists above ``ADMIN_COUNT_THRESHOLD`` rows are estimated
+    from the largest primary key. Filtered ones are counted up to the
+    threshold only, so a broad filter shows that many rows' worth of
+    pages. Counts are cached for ``ADMIN_COUNT_CACHE_TIMEOUT`` seconds.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        sql, params = queryset.values("pk").query.sql_with_params()
+        key = "admin-count-" + hashlib.md5(
+            f"{sql}|{params}".encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = self._count(queryset)
+            cache.set(key, count, settings.ADMIN_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _count(self, queryset):
+        threshold = settings.ADMIN_COUNT_THRESHOLD
+        if not queryset.query.where:
+            estimate = queryset.aggregate(last=Max("pk"))["last"] or 0
+            if estimate > threshold:
+                return estimate
+        return queryset.values("pk")[:threshold + 1].count()
+
+
+class ApproximateCountMixin:
+    """Changelists without exact counts: no unfiltered total is shown."""
 
-from .models import Group, Post
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ApproximateCountMixin, admin.ModelAdmin):
     list_display = ("pk", "text", "pub_date", "author")
+    list_select_related = ("author",)
     search_fields = ("text",)
     list_filter = ("pub_date",)
+    autocomplete_fields = ("author", "group")
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(search_term, queryset), False
 
-class GroupAdmin(admin.ModelAdmin):
+
+class GroupAdmin(ApproximateCountMixin, admin.ModelAdmin):
     list_display = ("pk", "title", "slug", "description")
     search_fields = ("title",)
     empty_value_display = "-пусто-"
 
 
+class CommentAdmin(ApproximateCountMixin, admin.ModelAdmin):
+    list_display = ("pk", "text", "post", "author", "created")
+    list_select_related = ("post", "author")
+    search_fields = ("text",)
+    raw_id_fields = ("post",)
+    autocomplete_fields = ("author",)
+    empty_value_display = "-пусто-"
+
+
+class FollowAdmin(ApproximateCountMixin, admin.ModelAdmin):
+    list_display = ("pk", "user", "author")
+    list_select_related = ("user", "author")
+    raw_id_fields = ("post",)
+    autocomplete_fields = ("user", "author")
+    empty_value_display = "-пусто-"
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,225 @@
+"""Read-only JSON API under ``/api/v1/``.
+
+Objects are serialized straight from ``values()`` rows: a call runs the
+same indexed queries as the HTML page but builds no model instances and
+renders no template. Lists are cursor paginated like the feeds,
+``?fields=id,text`` picks a subset of the fields, and responses carry the
+same validators as the pages (see ``posts.conditional``).
+"""
+import functools
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.http import require_GET
+
+from . import conditional, stats, timeline
+from .models import Comment, Group, Post, User
+from .paginator import DEFAULT_KEYS, CursorPaginator
+from .templatetags.paging import PAGE_PARAMS
+
+# API field name -> values() lookup
+POST_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "pub_date": "pub_date",
+    "author": "author__username",
+    "group": "group__slug",
+    "image": "image",
+    "comment_count": "comment_count",
+}
+COMMENT_FIELDS = {
+    "id": "id",
+    "post": "post_id",
+    "author": "author__username",
+    "text": "text",
+    "created": "created",
+}
+GROUP_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "slug": "slug",
+    "description": "description",
+}
+PROFILE_FIELDS = {
+    "id": "id",
+    "username": "username",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    **{name: f"stats__{name}" for name in stats.FIELDS},
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _media_url(name):
+    return default_storage.url(name) if name else None
+
+
+CONVERTERS = {"image": _media_url}
+
+
+def _error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def _json(data):
+    return JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+
+
+def api_view(view):
+    """Allow only GET and answer errors with JSON instead of HTML pages."""
+    @functools.wraps(view)
+    @require_GET
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return _error("Not found.", 404)
+        except BadRequest as error:
+            return _error(str(error), 400)
+    return wrapper
+
+
+def _selected(request, fields):
+    """Return the ``{name: lookup}`` pairs picked by ``?fields=``."""
+    names = [
+        name.strip() for name in request.GET.get("fields", "").split(",")
+        if name.strip()
+    ]
+    if not names:
+        return fields
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise BadRequest("Unknown fields: {}.".format(", ".join(unknown)))
+    return {name: fields[name] for name in names}
+
+
+def _values(queryset, selected, required=()):
+    return queryset.values(*{*selected.values(), *required})
+
+
+def _serialize(row, selected):
+    return {
+        name: CONVERTERS.get(name, lambda value: value)(row[lookup])
+        for name, lookup in selected.items()
+    }
+
+
+def _link(request, name, token):
+    if token is None:
+        return None
+    query = request.GET.copy()
+    for param in PAGE_PARAMS:
+        query.pop(param, None)
+    query[name] = token
+    return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+
+def _page(request, queryset, fields, keys=DEFAULT_KEYS):
+    selected = _selected(request, fields)
+    paginator = CursorPaginator(
+        _values(queryset, selected, keys), settings.API_PAGE_SIZE, keys=keys
+    )
+    page = paginator.page_from(request.GET)
+    return {
+        "results": [_serialize(row, selected) for row in page],
+        "next": _link(request, "after", page.next_token),
+        "previous": _link(request, "before", page.previous_token),
+    }
+
+
+def _detail(request, queryset, fields, required=()):
+    selected = _selected(request, fields)
+    row = _values(queryset, selected, required).first()
+    if row is None:
+        raise Http404
+    return row, _serialize(row, selected)
+
+
+@api_view
+@conditional.validated(conditional.index_scopes)
+def posts(request):
+    return _json(_page(request, Post.objects.all(), POST_FIELDS))
+
+
+@api_view
+@conditional.validated(conditional.post_id_scopes)
+def post_detail(request, post_id):
+    _, data = _detail(request, Post.objects.filter(pk=post_id), POST_FIELDS)
+    return _json(data)
+
+
+@api_view
+@conditional.validated(conditional.post_id_scopes)
+def post_comments(request, post_id):
+    """Comments of a post, newest first."""
+    comments = Comment.objects.filter(post_id=post_id)
+    return _json(
+        _page(request, comments, COMMENT_FIELDS, keys=("created", "id"))
+    )
+
+
+@api_view
+@conditional.validated(conditional.groups_scopes)
+def groups(request):
+    """Every group; there are few of them, so the list is not paginated."""
+    selected = _selected(request, GROUP_FIELDS)
+    rows = _values(Group.objects.order_by("title"), selected)
+    return _json({"results": [_serialize(row, selected) for row in rows]})
+
+
+@api_view
+@conditional.validated(conditional.group_scopes)
+def group_detail(request, slug):
+    _, data = _detail(request, Group.objects.filter(slug=slug), GROUP_FIELDS)
+    return _json(data)
+
+
+@api_view
+@conditional.validated(conditional.group_scopes)
+def group_posts(request, slug):
+    posts = Post.objects.filter(group__slug=slug)
+    return _json(_page(request, posts, POST_FIELDS))
+
+
+@api_view
+@conditional.validated(conditional.profile_scopes)
+def profile(request, username):
+    row, data = _detail(
+        request, User.objects.filter(username=username), PROFILE_FIELDS,
+        required=("id",)
+    )
+    counters = [name for name in stats.FIELDS if name in data]
+    if any(data[name] is None for name in counters):
+        author_stats = stats.for_author(row["id"])
+        for name in counters:
+            data[name] = getattr(author_stats, name)
+    return _json(data)
+
+
+@api_view
+@conditional.validated(conditional.profile_scopes)
+def profile_posts(request, username):
+    posts = Post.objects.filter(author__username=username)
+    return _json(_page(request, posts, POST_FIELDS))
+
+
+@api_view
+def follow_feed(request):
+    """Follow feed of the logged-in user.
+
+    Timelines change without bumping any scope, so the ETag is a hash of
+    the body: it saves the transfer, not the queries.
+    """
+    if not request.user.is_authenticated:
+        return _error("Authentication required.", 401)
+    posts = timeline.feed_for(request.user)
+    response = _json(_page(request, posts, POST_FIELDS))
+    set_response_etag(response)
+    return get_conditional_response(
+        request, etag=response["ETag"], response=response
+    )
@@ -0,0 +1,140 @@
+"""Generational cache of post list pages.
+
+Only the post ids of a page are cached, tagged with the version of the
+list's scope (``index``, ``group-<id>``, ``profile-<id>``) they were read
+at. Writes bump the version of every affected scope, when they happen and
+when they commit, which turns the old entries stale instead of deleting
+them one by one; ``posts.stampede`` rebuilds each stale page once while
+other requests keep serving it.
+Pages read from a replica are cached apart, see ``yatube.routers``.
+
+Versions are nanosecond timestamps of the last change, so they double as
+``Last-Modified`` values (see ``posts.conditional``). ``recording`` lists
+the versions a request read, the surrogate keys of ``posts.page_cache``.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from yatube import routers
+
+from . import metrics, stampede
+from .paginator import CursorPaginator
+
+
+_reads = threading.local()
+
+
+def _version_key(scope):
+    return f"feed-version-{scope}"
+
+
+@contextmanager
+def recording():
+    """Collect ``{scope: version}`` of the versions read in the block.
+
+    A scope whose content was served at an unknown, older version is
+    recorded as ``None``.
+    """
+    previous = getattr(_reads, "versions", None)
+    _reads.versions = {}
+    try:
+        yield _reads.versions
+    finally:
+        _reads.versions = previous
+
+
+def _record(versions, replace=False):
+    recorded = getattr(_reads, "versions", None)
+    if recorded is not None:
+        for scope, version in versions.items():
+            if replace:
+                recorded[scope] = version
+            else:
+                recorded.setdefault(scope, version)
+
+
+def post_scopes(author_id, group_id=None):
+    scopes = ["index", f"profile-{author_id}"]
+    if group_id is not None:
+        scopes.append(f"group-{group_id}")
+    return scopes
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # A fresh value instead of 1 so a lost counter never resurrects
+        # entries written under an earlier version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    _record({scope: version})
+    return version
+
+
+def get_versions(*scopes):
+    """Return the versions of several scopes with one cache round trip."""
+    keys = {_version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    _record(versions)
+    for scope in scopes:
+        if scope not in versions:
+            versions[scope] = get_version(scope)
+    return versions
+
+
+def _bump(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    current = cache.get_many(keys)
+    cache.set_many({
+        key: max(time.time_ns(), current.get(key, 0) + 1) for key in keys
+    }, timeout=None)
+
+
+def bump(*scopes):
+    """Move the versions of ``scopes`` on, and again once the transaction
+    commits.
+
+    Until the commit other connections still read the old rows, and a
+    page rebuilt from them in between would be cached under the new
+    version; the second bump turns it stale. The first one keeps the
+    writing transaction's own reads current.
+    """
+    _bump(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def bump_cards(*scopes):
+    """Bump card scopes plus ``cards``, which covers every rendered card."""
+    bump(*scopes, "cards")
+
+
+def feed_page(params, scope, queryset, per_page=10, serve_stale=True):
+    """Return the page of ``queryset`` addressed by request ``params``.
+
+    With ``serve_stale`` the previous version of the page may be returned
+    while another request rebuilds it.
+    """
+    paginator = CursorPaginator(queryset, per_page)
+    built = []
+
+    def build():
+        built.append(paginator.page_from(params))
+        return paginator.snapshot(built[0])
+
+    snapshot, result = stampede.fetch(
+        routers.cache_key(f"feed-{scope}-{paginator.normalize(params)}"),
+        build, routers.cache_timeout(settings.FEED_CACHE_TIMEOUT),
+        version=get_version(scope), serve_stale=serve_stale
+    )
+    metrics.cache_lookup("feed_page", result)
+    if result == stampede.STALE:
+        _record({scope: None}, replace=True)
+    return built[0] if built else paginator.restore(snapshot)
@@ -0,0 +1,46 @@
+"""Cached resolution of the group and author named in a feed URL.
+
+Every group and profile page, and its conditional GET check, resolves the
+slug or username first. The rows rarely change, so they are kept in the
+cache and dropped from model signals whenever one is saved or deleted.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Group, User
+
+
+def _group_key(slug):
+    return f"lookup-group-{slug}"
+
+
+def _user_key(username):
+    return f"lookup-user-{username}"
+
+
+def _cached(key, queryset, **lookup):
+    instance = cache.get(key)
+    if instance is None:
+        instance = queryset.filter(**lookup).first()
+        if instance is None:
+            raise Http404(f"No {queryset.model._meta.object_name} matches.")
+        cache.set(key, instance, settings.LOOKUP_CACHE_TIMEOUT)
+    return instance
+
+
+def group_or_404(slug):
+    return _cached(_group_key(slug), Group.objects, slug=slug)
+
+
+def user_or_404(username):
+    return _cached(_user_key(username), User.objects, username=username)
+
+
+def forget_group(*slugs):
+    cache.delete_many([_group_key(slug) for slug in slugs if slug])
+
+
+def forget_user(*usernames):
+    cache.delete_many([_user_key(username) for username in usernames
+                       if username])
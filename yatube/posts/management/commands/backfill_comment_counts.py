@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate Post.comment_count from the comments table in short "
+        "transactions so writers are not locked out for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause", type=float, default=0.05,
+            help="Seconds to sleep between chunks to let writers in."
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = Post.objects.aggregate(last=Max("id"))["last"] or 0
+        total = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        updated = 0
+        for start in range(0, last_id, chunk_size):
+            with transaction.atomic():
+                updated += Post.objects.filter(
+                    pk__gt=start, pk__lte=start + chunk_size
+                ).update(comment_count=Coalesce(
+                    Subquery(total, output_field=IntegerField()), 0
+                ))
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(f"Updated comment counters of {updated} posts.")
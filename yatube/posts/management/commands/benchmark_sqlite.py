@@ -0,0 +1,129 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.utils import OperationalError
+from django.test.utils import override_settings
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+PROFILES = {
+    "stock": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {},
+    },
+    "tuned": {
+        "ENGINE": settings.DATABASES["default"]["ENGINE"],
+        "CONN_MAX_AGE": settings.DATABASES["default"]["CONN_MAX_AGE"],
+        "OPTIONS": settings.DATABASES["default"]["OPTIONS"],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent commenters and feed readers against scratch "
+        "databases with the stock sqlite3 backend (a connection per "
+        "request) and with the configured one, and compare throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5)
+
+    def handle(self, *args, **options):
+        for name, profile in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                alias = f"benchmark_{name}"
+                connections.databases[alias] = {
+                    **settings.DATABASES["default"],
+                    **profile,
+                    "NAME": os.path.join(directory, "db.sqlite3"),
+                }
+                try:
+                    # Lock waits are the point here, keep them out of the log.
+                    with override_settings(SLOW_QUERY_THRESHOLD=None):
+                        result = self.run(alias, profile, options)
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+            self.stdout.write(
+                "{:<6} {writes:8.0f} writes/s {reads:8.0f} reads/s "
+                "{errors:6} lock errors".format(name, **result)
+            )
+
+    def run(self, alias, profile, options):
+        call_command("migrate", database=alias, verbosity=0)
+        User.objects.using(alias).bulk_create([User(username="bench")])
+        author = User.objects.using(alias).get()
+        Post.objects.using(alias).bulk_create(
+            Post(text=f"Пост {i}", author=author) for i in range(100)
+        )
+        connections[alias].close()
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["seconds"]
+
+        def worker(operation, counter):
+            done = errors = 0
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        operation(alias, author.id)
+                        done += 1
+                    except OperationalError:
+                        errors += 1
+                    if not profile["CONN_MAX_AGE"]:
+                        connections[alias].close()
+            finally:
+                connections[alias].close()
+                with lock:
+                    counts[counter] += done
+                    counts["errors"] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=(comment, "writes"))
+            for _ in range(options["writers"])
+        ] + [
+            threading.Thread(target=worker, args=(read_feed, "reads"))
+            for _ in range(options["readers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {
+            "writes": counts["writes"] / options["seconds"],
+            "reads": counts["reads"] / options["seconds"],
+            "errors": counts["errors"],
+        }
+
+
+def comment(alias, author_id):
+    """What add_comment does: read the post, then write two rows."""
+    with transaction.atomic(using=alias):
+        post_id = (
+            Post.objects.using(alias).order_by("-pub_date")
+            .values_list("id", flat=True).first()
+        )
+        Comment.objects.using(alias).bulk_create([
+            Comment(post_id=post_id, author_id=author_id, text="Комментарий")
+        ])
+        Post.objects.using(alias).filter(pk=post_id).update(
+            comment_count=F("comment_count") + 1
+        )
+
+
+def read_feed(alias, author_id):
+    list(Post.objects.using(alias).select_related("author")[:10])
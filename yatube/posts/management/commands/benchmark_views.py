@@ -0,0 +1,190 @@
+import copy
+import json
+import math
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+VIEWS = ("index", "group_posts", "profile", "post_view", "follow_index")
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    values = sorted(values)
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def busiest(queryset, field):
+    """Return the value of ``field`` with the most rows in ``queryset``."""
+    return (
+        queryset.order_by().values(field).annotate(total=Count("id"))
+        .order_by("-total").values_list(field, flat=True).first()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Report p50/p95 latency and query counts of the feed and post "
+        "views, optionally on scratch databases seeded with seed_load, "
+        "and compare them with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="",
+            help="Comma separated post counts. Each size is measured on a "
+                 "scratch test database filled by seed_load; without it "
+                 "the current database is measured."
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--warm", action="store_true",
+            help="Keep the cache between requests instead of clearing it."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--save", help="Write results to this file.")
+        parser.add_argument("--compare", help="Baseline file to check.")
+        parser.add_argument(
+            "--tolerance", type=float, default=1.5,
+            help="Allowed p95 slowdown factor against the baseline."
+        )
+
+    def handle(self, *args, **options):
+        # The runs clear the cache, so they get one of their own instead of
+        # the one the workers of this host share.
+        with tempfile.TemporaryDirectory() as directory:
+            caches = copy.deepcopy(settings.CACHES)
+            caches["default"]["LOCATION"] = os.path.join(
+                directory, "cache.sqlite3"
+            )
+            with override_settings(CACHES=caches):
+                self.benchmark(options)
+
+    def benchmark(self, options):
+        self.options = options
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        if sizes:
+            results = {str(size): self.on_scratch_db(size) for size in sizes}
+        else:
+            results = {"current": self.measure_all()}
+        if options["save"]:
+            with open(options["save"], "w") as stream:
+                json.dump(results, stream, indent=2, sort_keys=True)
+        if options["compare"]:
+            self.compare(results, options["compare"])
+
+    def on_scratch_db(self, size):
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            call_command(
+                "seed_load", posts=size, users=max(size // 50, 10),
+                groups=max(size // 2000, 3), comments=size // 2,
+                follows=20, seed=self.options["seed"],
+                batch_size=5000, stdout=StringIO()
+            )
+            return self.measure_all(label=str(size))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def targets(self):
+        author = busiest(Post.objects, "author__username")
+        reader = busiest(Follow.objects, "user_id")
+        post = (
+            Post.objects.filter(author__username=author)
+            .order_by("-comment_count").values_list("id", flat=True).first()
+        )
+        if author is None or reader is None:
+            raise CommandError("Seed some posts and follows first.")
+        group = Group.objects.filter(
+            pk=busiest(Post.objects.exclude(group=None), "group_id")
+        ).values_list("slug", flat=True).first()
+        return reader, {
+            "index": reverse("index"),
+            "group_posts": group and reverse("group_posts", args=[group]),
+            "profile": reverse("profile", args=[author]),
+            "post_view": reverse("post", args=[author, post]),
+            "follow_index": reverse("follow_index"),
+        }
+
+    def measure_all(self, label="current"):
+        cache.clear()
+        reader, urls = self.targets()
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(User.objects.get(pk=reader))
+        results = {}
+        for name in VIEWS:
+            if urls[name] is None:
+                continue
+            results[name] = self.measure(client, urls[name])
+            self.stdout.write(
+                "{:>10} {:<13} p50 {p50_ms:8.2f} ms  p95 {p95_ms:8.2f} ms  "
+                "{queries:3} queries".format(label, name, **results[name])
+            )
+        return results
+
+    def measure(self, client, url):
+        timings, queries = [], []
+        for _ in range(self.options["repeat"]):
+            if not self.options["warm"]:
+                cache.clear()
+            # DEBUG keeps a bounded query log; a full one counts nothing.
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} answered {response.status_code}.")
+            queries.append(len(captured))
+        return {
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "queries": max(queries),
+        }
+
+    def compare(self, results, path):
+        with open(path) as stream:
+            baseline = json.load(stream)
+        regressions = []
+        for label, views in results.items():
+            for name, result in views.items():
+                expected = baseline.get(label, {}).get(name)
+                if expected is None:
+                    continue
+                if result["queries"] > expected["queries"]:
+                    regressions.append(
+                        f"{label} {name}: {result['queries']} queries, "
+                        f"baseline {expected['queries']}"
+                    )
+                limit = expected["p95_ms"] * self.options["tolerance"]
+                if result["p95_ms"] > limit:
+                    regressions.append(
+                        f"{label} {name}: p95 {result['p95_ms']} ms, "
+                        f"baseline {expected['p95_ms']} ms"
+                    )
+        if regressions:
+            raise CommandError(
+                "Regressions against {}:\n{}".format(
+                    path, "\n".join(regressions)
+                )
+            )
+        self.stdout.write(f"No regressions against {path}.")
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Group, Post
+from posts.transfer import Progress, dump, open_stream
+
+User = get_user_model()
+
+EXPORTS = (
+    ("user", User.objects.order_by("pk"), {
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "email": "email",
+        "password": "password",
+        "date_joined": "date_joined",
+    }),
+    ("group", Group.objects.order_by("pk"), {
+        "title": "title",
+        "slug": "slug",
+        "description": "description",
+    }),
+    ("post", Post.objects.order_by("pk"), {
+        "pk": "pk",
+        "text": "text",
+        "pub_date": "pub_date",
+        "author": "author__username",
+        "group": "group__slug",
+        "image": "image",
+        "comment_count": "comment_count",
+    }),
+    ("comment", Comment.objects.order_by("pk"), {
+        "pk": "pk",
+        "post": "post_id",
+        "author": "author__username",
+        "text": "text",
+        "created": "created",
+    }),
+    ("follow", Follow.objects.order_by("pk"), {
+        "user": "user__username",
+        "author": "author__username",
+        "post": "post_id",
+    }),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream users, groups, posts, comments and follows to a JSONL file "
+        "(gzipped if the name ends with .gz) in bounded memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--gzip", action="store_true", default=None)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--progress-every", type=int, default=100000,
+            help="Report progress after this many rows of a model."
+        )
+
+    def handle(self, *args, **options):
+        progress = Progress(self.stdout, options["progress_every"])
+        with open_stream(options["path"], "w", options["gzip"]) as stream:
+            for model, queryset, fields in EXPORTS:
+                rows = queryset.values_list(*fields.values()).iterator(
+                    chunk_size=options["chunk_size"]
+                )
+                for row in rows:
+                    record = dict(zip(fields, row))
+                    record["model"] = model
+                    stream.write(dump(record) + "\n")
+                    progress.add(model)
+        self.stdout.write(f"Exported {progress.summary()}")
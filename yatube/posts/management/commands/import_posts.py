@@ -0,0 +1,140 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from posts.models import Comment, Follow, Group, Post
+from posts.transfer import (MODELS, Progress, keep_dates, open_stream,
+                            refresh_derived, reset_sequences)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a file written by export_posts with batched bulk_create. "
+        "Users and groups are matched by username and slug, post and "
+        "comment ids are shifted past the ids already in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--gzip", action="store_true", default=None)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--progress-every", type=int, default=100000,
+            help="Report progress after this many rows of a model."
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.progress = Progress(self.stdout, options["progress_every"])
+        self.user_ids, self.group_ids = {}, {}
+        self.authors, self.groups = set(), set()
+        self.post_offset = Post.objects.aggregate(m=Max("pk"))["m"] or 0
+        self.comment_offset = (
+            Comment.objects.aggregate(m=Max("pk"))["m"] or 0
+        )
+        batch, model = [], None
+        with open_stream(options["path"], "r", options["gzip"]) as stream, \
+                keep_dates(Post._meta.get_field("pub_date"),
+                           Comment._meta.get_field("created")):
+            for number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    raise CommandError(f"Line {number}: {error}")
+                if record.get("model") not in MODELS:
+                    raise CommandError(f"Line {number}: unknown model.")
+                if record["model"] != model or len(batch) >= self.batch_size:
+                    self.flush(model, batch)
+                    batch, model = [], record["model"]
+                batch.append(record)
+            self.flush(model, batch)
+        reset_sequences(Post, Comment)
+        refresh_derived(
+            self.authors, self.groups, self.batch_size, self.stdout
+        )
+        self.stdout.write(f"Imported {self.progress.summary()}")
+
+    def flush(self, model, records):
+        if not records:
+            return
+        with transaction.atomic():
+            getattr(self, f"load_{model}s")(records)
+        self.progress.add(model, len(records))
+
+    def resolve(self, model, ids, key, records, build):
+        """Map natural keys to ids, creating the rows that are missing."""
+        wanted = {record[key]: record for record in records}
+        lookup = {f"{key}__in": list(wanted)}
+        found = dict(model.objects.filter(**lookup).values_list(key, "pk"))
+        missing = [build(r) for k, r in wanted.items() if k not in found]
+        if missing:
+            model.objects.bulk_create(missing)
+            found = dict(
+                model.objects.filter(**lookup).values_list(key, "pk")
+            )
+        ids.update(found)
+
+    def user_id(self, username):
+        try:
+            return self.user_ids[username]
+        except KeyError:
+            raise CommandError(f"User {username!r} is not in the file.")
+
+    def load_users(self, records):
+        self.resolve(User, self.user_ids, "username", records, lambda r: User(
+            **{k: v for k, v in r.items() if k != "model"}
+        ))
+
+    def load_groups(self, records):
+        self.resolve(Group, self.group_ids, "slug", records, lambda r: Group(
+            title=r["title"], slug=r["slug"], description=r["description"]
+        ))
+
+    def load_posts(self, records):
+        posts = []
+        for record in records:
+            author_id = self.user_id(record["author"])
+            group_id = self.group_ids.get(record["group"])
+            self.authors.add(author_id)
+            self.groups.add(group_id)
+            posts.append(Post(
+                pk=record["pk"] + self.post_offset,
+                text=record["text"],
+                pub_date=record["pub_date"],
+                author_id=author_id,
+                group_id=group_id,
+                image=record["image"] or None,
+                comment_count=record["comment_count"],
+            ))
+        Post.objects.bulk_create(posts)
+
+    def load_comments(self, records):
+        Comment.objects.bulk_create(Comment(
+            pk=record["pk"] + self.comment_offset,
+            post_id=record["post"] + self.post_offset,
+            author_id=self.user_id(record["author"]),
+            text=record["text"],
+            created=record["created"],
+        ) for record in records)
+
+    def load_follows(self, records):
+        follows = []
+        for record in records:
+            author_id = self.user_id(record["author"])
+            self.authors.add(author_id)
+            post_id = record["post"]
+            if post_id is not None:
+                post_id += self.post_offset
+            follows.append(Follow(
+                user_id=self.user_id(record["user"]),
+                author_id=author_id,
+                post_id=post_id,
+            ))
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the posts full-text index and its triggers, e.g. after a "
+        "migration rebuilt the posts table."
+    )
+
+    def handle(self, *args, **options):
+        if not search.uses_fts():
+            self.stdout.write("Full-text index is only used on SQLite.")
+            return
+        with connection.schema_editor() as schema_editor:
+            search.install(schema_editor)
+        self.stdout.write("Search index rebuilt.")
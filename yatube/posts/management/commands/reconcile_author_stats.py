@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import AuthorStats
+from posts.stats import FIELDS, exact_counts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized author counters and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        checked = repaired = 0
+        while True:
+            author_ids = list(
+                User.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not author_ids:
+                break
+            last_id = author_ids[-1]
+            checked += len(author_ids)
+            repaired += self.reconcile(author_ids)
+        self.stdout.write(
+            f"Checked {checked} authors, repaired {repaired}."
+        )
+
+    def reconcile(self, author_ids):
+        counts = exact_counts(author_ids)
+        with transaction.atomic():
+            existing = AuthorStats.objects.select_for_update().in_bulk(
+                author_ids
+            )
+            changed, missing = [], []
+            for author_id, values in counts.items():
+                stats = existing.get(author_id)
+                if stats is None:
+                    missing.append(AuthorStats(author_id=author_id, **values))
+                    continue
+                if any(getattr(stats, f) != values[f] for f in FIELDS):
+                    for field, value in values.items():
+                        setattr(stats, field, value)
+                    changed.append(stats)
+            AuthorStats.objects.bulk_update(changed, FIELDS)
+            AuthorStats.objects.bulk_create(missing)
+        return len(changed) + len(missing)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescore the follow suggestions of readers whose follows changed, "
+        "or of everyone with --all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", dest="everyone",
+            help="Rescore every reader, not only the queued ones."
+        )
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Keep rescoring queued readers every this many seconds."
+        )
+
+    def handle(self, *args, **options):
+        everyone = options["everyone"]
+        while True:
+            started = time.monotonic()
+            count = recommendations.refresh(everyone, stdout=self.stdout)
+            engine = "python" if recommendations.numpy is None else "numpy"
+            self.stdout.write(
+                f"Rescored {count} readers with {engine} in "
+                f"{(time.monotonic() - started) * 1000:.0f} ms."
+            )
+            if not options["interval"]:
+                break
+            everyone = False
+            time.sleep(options["interval"])
@@ -0,0 +1,155 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post
+from posts.transfer import (Progress, keep_dates, refresh_derived,
+                            reset_sequences)
+
+User = get_user_model()
+
+# Hashes to nothing, seeded users cannot log in with a password.
+UNUSABLE_PASSWORD = "!seed"
+
+
+def next_id(model):
+    return (model.objects.aggregate(m=Max("pk"))["m"] or 0) + 1
+
+
+def skewed(ids, skew):
+    """Cumulative Zipf-like weights: the first ids are the most popular."""
+    return list(itertools.accumulate(
+        1 / (rank + 1) ** skew for rank in range(len(ids))
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk insert synthetic users, groups, posts, comments and follows "
+        "for load testing. Authorship and follows follow a Zipf-like "
+        "distribution, so a few authors own most posts and followers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument(
+            "--follows", type=int, default=20,
+            help="Average number of authors each new user follows."
+        )
+        parser.add_argument("--skew", type=float, default=1.1)
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="Spread publication dates over this many days."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.progress = Progress(self.stdout, self.batch_size * 20)
+        self.now = timezone.now()
+        self.span = timedelta(days=options["days"]).total_seconds()
+        users = self.seed_users(options["users"])
+        groups = self.seed_groups(options["groups"])
+        authors = skewed(users, options["skew"])
+        with keep_dates(Post._meta.get_field("pub_date"),
+                        Comment._meta.get_field("created")):
+            posts = self.seed_posts(
+                options["posts"], users, authors, groups, options["skew"]
+            )
+            self.seed_comments(options["comments"], users, posts)
+        self.seed_follows(options["follows"], users, authors)
+        reset_sequences(User, Group, Post, Comment)
+        call_command("backfill_comment_counts", pause=0, stdout=self.stdout)
+        refresh_derived(users, groups, self.batch_size, self.stdout)
+        self.stdout.write(f"Seeded {self.progress.summary()}")
+
+    def batches(self, model, objects):
+        """Insert ``objects`` in batches, one transaction per batch."""
+        name = model._meta.model_name
+        objects = iter(objects)
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+            self.progress.add(name, len(batch))
+
+    def date(self):
+        return self.now - timedelta(seconds=self.rng.random() * self.span)
+
+    def seed_users(self, count):
+        start = next_id(User)
+        ids = range(start, start + count)
+        self.batches(User, (User(
+            pk=pk, username=f"seed-user-{pk}", password=UNUSABLE_PASSWORD
+        ) for pk in ids))
+        return ids
+
+    def seed_groups(self, count):
+        start = next_id(Group)
+        ids = range(start, start + count)
+        self.batches(Group, (Group(
+            pk=pk, title=f"Группа {pk}", slug=f"seed-group-{pk}",
+            description="Сгенерированная группа",
+        ) for pk in ids))
+        return ids
+
+    def seed_posts(self, count, users, authors, groups, skew):
+        start = next_id(Post)
+        group_weights = skewed(groups, skew)
+
+        def posts():
+            for pk in range(start, start + count):
+                group = None
+                if groups and self.rng.random() < 0.7:
+                    group = self.rng.choices(
+                        groups, cum_weights=group_weights
+                    )[0]
+                yield Post(
+                    pk=pk,
+                    text=f"Сгенерированный пост {pk}",
+                    pub_date=self.date(),
+                    author_id=self.rng.choices(
+                        users, cum_weights=authors
+                    )[0],
+                    group_id=group,
+                )
+        self.batches(Post, posts())
+        return range(start, start + count)
+
+    def seed_comments(self, count, users, posts):
+        if not posts:
+            return
+        start = next_id(Comment)
+        self.batches(Comment, (Comment(
+            pk=pk,
+            post_id=self.rng.choice(posts),
+            author_id=self.rng.choice(users),
+            text=f"Комментарий {pk}",
+            created=self.date(),
+        ) for pk in range(start, start + count)))
+
+    def seed_follows(self, average, users, authors):
+        def follows():
+            for user_id in users:
+                wanted = self.rng.randint(0, 2 * average)
+                chosen = set(self.rng.choices(
+                    users, cum_weights=authors, k=wanted
+                ))
+                chosen.discard(user_id)
+                for author_id in chosen:
+                    yield Follow(user_id=user_id, author_id=author_id)
+        self.batches(Follow, follows())
@@ -0,0 +1,66 @@
+import json
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def shape(sql):
+    """Collapse ``IN (%s, %s, ...)`` lists so statements group together."""
+    return re.sub(r"\((?:%s, )+%s\)", "(%s, ...)", sql)
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow query log, slowest statements first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=None)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--full-scans", action="store_true",
+            help="Only show statements that scan a watched table."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or settings.SLOW_QUERY_LOG
+        groups = defaultdict(lambda: {
+            "count": 0, "total": 0.0, "max": 0.0,
+            "views": Counter(), "origins": Counter(), "full_scans": set(),
+        })
+        try:
+            with open(path) as log:
+                for line in log:
+                    entry = json.loads(line)
+                    group = groups[shape(entry["sql"])]
+                    group["count"] += 1
+                    group["total"] += entry["ms"]
+                    group["max"] = max(group["max"], entry["ms"])
+                    group["views"][entry["view"] or "-"] += 1
+                    group["origins"][entry["origin"] or "-"] += 1
+                    group["full_scans"].update(entry["full_scans"])
+        except FileNotFoundError:
+            raise CommandError(f"No slow query log at {path}.")
+        ranked = sorted(
+            groups.items(), key=lambda item: item[1]["total"], reverse=True
+        )
+        if options["full_scans"]:
+            ranked = [item for item in ranked if item[1]["full_scans"]]
+        for sql, group in ranked[:options["top"]]:
+            self.stdout.write(
+                "{count} x, {total:.1f} ms total, {max:.1f} ms max".format(
+                    **group
+                )
+            )
+            if group["full_scans"]:
+                self.stdout.write("  FULL SCAN: {}".format(
+                    ", ".join(sorted(group["full_scans"]))
+                ))
+            self.stdout.write("  views: {}".format(", ".join(
+                f"{view} ({count})"
+                for view, count in group["views"].most_common(3)
+            )))
+            self.stdout.write("  from: {}".format(
+                group["origins"].most_common(1)[0][0]
+            ))
+            self.stdout.write(f"  {sql}\n")
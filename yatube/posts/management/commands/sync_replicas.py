@@ -0,0 +1,44 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into every replica with the "
+        "online backup API. A local stand-in for replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Keep syncing every this many seconds instead of once."
+        )
+
+    def handle(self, *args, **options):
+        primary = connections["default"]
+        if primary.vendor != "sqlite":
+            raise CommandError("Only SQLite primaries can be synced.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No DATABASE_REPLICAS are configured.")
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                self.sync(primary, alias)
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def sync(self, primary, alias):
+        started = time.monotonic()
+        primary.ensure_connection()
+        target = sqlite3.connect(connections.databases[alias]["NAME"])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(
+            f"Synced {alias} in {(time.monotonic() - started) * 1000:.0f} ms."
+        )
@@ -0,0 +1,257 @@
+"""Per-view request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` records latency histograms, DB query counts and time
+and template render time per URL name; ``cache_lookup`` counts hits and
+misses of the page caches. Counters are summed in process and flushed
+every ``METRICS_FLUSH_INTERVAL`` seconds into the SQLite file
+``METRICS_DB``, which every worker process on the host shares, so the
+``/metrics`` endpoint reports totals across workers.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, "+Inf")
+
+FAMILIES = {
+    "yatube_request_duration_seconds": (
+        "histogram", "Request latency by URL name."
+    ),
+    "yatube_db_queries_total": ("counter", "DB queries by URL name."),
+    "yatube_db_query_seconds_total": (
+        "counter", "Time spent in DB queries by URL name."
+    ),
+    "yatube_template_render_seconds_total": (
+        "counter", "Time spent rendering templates by URL name."
+    ),
+    "yatube_cache_requests_total": (
+        "counter", "Page cache lookups by cache and result."
+    ),
+}
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = defaultdict(float)
+_last_flush = time.monotonic()
+
+
+def _labels(**labels):
+    return ",".join(
+        '{}="{}"'.format(name, str(value).replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+
+
+def _add(name, labels, value=1):
+    with _lock:
+        _pending[name, labels] += value
+
+
+def observe_request(view, seconds, queries, db_seconds, template_seconds):
+    family = "yatube_request_duration_seconds"
+    for bound in BUCKETS:
+        if bound == "+Inf" or seconds <= bound:
+            _add(f"{family}_bucket", _labels(view=view, le=bound))
+    _add(f"{family}_sum", _labels(view=view), seconds)
+    _add(f"{family}_count", _labels(view=view))
+    _add("yatube_db_queries_total", _labels(view=view), queries)
+    _add("yatube_db_query_seconds_total", _labels(view=view), db_seconds)
+    _add(
+        "yatube_template_render_seconds_total", _labels(view=view),
+        template_seconds
+    )
+
+
+def cache_lookup(cache_name, result):
+    """Count a lookup of one of the page caches, ``result`` is ``True`` for
+    a hit, ``False`` for a miss or a ``posts.stampede`` result."""
+    if isinstance(result, bool):
+        result = "hit" if result else "miss"
+    _add(
+        "yatube_cache_requests_total",
+        _labels(cache=cache_name, result=result)
+    )
+
+
+def _connect():
+    store = sqlite3.connect(settings.METRICS_DB, timeout=5)
+    store.execute(
+        "CREATE TABLE IF NOT EXISTS metric ("
+        "name TEXT, labels TEXT, value REAL, PRIMARY KEY (name, labels))"
+    )
+    return store
+
+
+def flush():
+    """Add the counters of this process to the shared store."""
+    global _last_flush
+    with _lock:
+        rows = [(name, labels, value)
+                for (name, labels), value in _pending.items()]
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not rows:
+        return
+    try:
+        store = _connect()
+        try:
+            with store:
+                store.executemany(
+                    "INSERT INTO metric (name, labels, value) "
+                    "VALUES (?, ?, ?) ON CONFLICT (name, labels) "
+                    "DO UPDATE SET value = value + excluded.value",
+                    rows
+                )
+        finally:
+            store.close()
+    except Exception:
+        # Keep the counters for the next flush.
+        for name, labels, value in rows:
+            _add(name, labels, value)
+        raise
+
+
+def maybe_flush():
+    """Flush when due; a failing store must not fail the request."""
+    if time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        try:
+            flush()
+        except Exception:
+            logger.exception("Flushing metrics to %s failed",
+                             settings.METRICS_DB)
+
+
+def clear():
+    """Drop every stored and pending counter."""
+    with _lock:
+        _pending.clear()
+    store = _connect()
+    try:
+        with store:
+            store.execute("DELETE FROM metric")
+    finally:
+        store.close()
+
+
+def _family(name):
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+
+def render():
+    """Return the stored counters in the Prometheus text format."""
+    flush()
+    store = _connect()
+    try:
+        rows = store.execute(
+            "SELECT name, labels, value FROM metric ORDER BY name, labels"
+        ).fetchall()
+    finally:
+        store.close()
+    by_family = defaultdict(list)
+    for name, labels, value in rows:
+        by_family[_family(name)].append((name, labels, value))
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels, value in by_family[family]:
+            lines.append(f"{name}{{{labels}}} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class _Request:
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+
+def current_view():
+    """Return the URL name of the view this thread is serving, if any."""
+    current = getattr(_local, "request", None)
+    return current.view if current is not None else None
+
+
+def _record_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current = getattr(_local, "request", None)
+        if current is not None:
+            current.queries += 1
+            current.db_seconds += time.perf_counter() - started
+
+
+class TimedTemplate(django_backend.Template):
+    def render(self, context=None, request=None):
+        current = getattr(_local, "request", None)
+        if current is None:
+            return super().render(context, request)
+        # Cards are rendered inside the page, only count the outermost.
+        current.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            current.template_depth -= 1
+            if not current.template_depth:
+                current.template_seconds += time.perf_counter() - started
+
+
+class MetricsTemplates(django_backend.DjangoTemplates):
+    """The Django template backend with render timing."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        current = _local.request = _Request()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(_record_query):
+                response = self.get_response(request)
+        finally:
+            _local.request = None
+        match = request.resolver_match
+        observe_request(
+            match.url_name if match and match.url_name else "unresolved",
+            time.perf_counter() - started,
+            current.queries,
+            current.db_seconds,
+            current.template_seconds,
+        )
+        maybe_flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current = getattr(_local, "request", None)
+        if current is not None and request.resolver_match:
+            current.view = request.resolver_match.url_name
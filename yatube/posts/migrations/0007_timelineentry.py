@@ -0,0 +1,61 @@
+# Generated by Django 2.2.6 on 2026-10-18 02:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_LIMIT = 500
+
+
+def backfill_timelines(apps, schema_editor):
+    Follow = apps.get_model("posts", "Follow")
+    Post = apps.get_model("posts", "Post")
+    TimelineEntry = apps.get_model("posts", "TimelineEntry")
+    db = schema_editor.connection.alias
+    for user_id, author_id in Follow.objects.using(db).values_list(
+        "user_id", "author_id"
+    ).iterator():
+        posts = Post.objects.using(db).filter(author_id=author_id).order_by(
+            "-pub_date", "-id"
+        ).values_list("id", "pub_date")[:BACKFILL_LIMIT]
+        TimelineEntry.objects.using(db).bulk_create(
+            [
+                TimelineEntry(
+                    user_id=user_id, post_id=post_id, pub_date=pub_date
+                )
+                for post_id, pub_date in posts
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_auto_20210805_1242'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='date published')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Читатель')),
+            ],
+            options={
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'pub_date', 'post'], name='timeline_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='uniq_timeline_entry'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.6 on 2026-10-18 02:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0007_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='записей')),
+                ('followers_count', models.IntegerField(default=0, verbose_name='подписчиков')),
+                ('following_count', models.IntegerField(default=0, verbose_name='подписок')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.6 on 2026-10-18 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='комментариев'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# The SQL as of this migration; posts.search may move on.
+INSTALL_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, content='posts_post', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT ON posts_post "
+    "BEGIN INSERT INTO posts_post_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE ON posts_post "
+    "BEGIN INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au "
+    "AFTER UPDATE OF text ON posts_post "
+    "BEGIN INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); END",
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+)
+
+UNINSTALL_SQL = (
+    "DROP TRIGGER IF EXISTS posts_post_fts_ai",
+    "DROP TRIGGER IF EXISTS posts_post_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_post_fts_au",
+    "DROP TABLE IF EXISTS posts_post_fts",
+)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(INSTALL_SQL), run(UNINSTALL_SQL)),
+    ]
@@ -4,6 +4,12 @@ from django.db import models
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Load everything ``post_item.html`` needs in the page query."""
+        return self.select_related("author", "group")
+
+
 class Post(models.Model):
     text = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -16,13 +22,40 @@ class Post(models.Model):
         related_name="posts"
     )
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    comment_count = models.PositiveIntegerField(
+        "комментариев", default=0, editable=False
+    )
     verbose_name = "Пост"
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # comment_count only moves through F() updates, writing back the
+        # value loaded with the post would undo concurrent comments.
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "comment_count"
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ("-pub_date",)
+        # Feeds page by (pub_date, id) newest first, see posts.paginator.
+        indexes = (
+            models.Index(fields=["-pub_date", "-id"], name="post_date_idx"),
+            models.Index(fields=["author", "-pub_date", "-id"],
+                         name="post_author_date_idx"),
+            models.Index(fields=["group", "-pub_date", "-id"],
+                         name="post_group_date_idx"),
+        )
 
 
 class Group(models.Model):
@@ -53,6 +86,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created']
+        indexes = (
+            models.Index(fields=["post", "created", "id"],
+                         name="comment_post_created_idx"),
+        )
 
     def __str__(self):
         return self.text
@@ -83,6 +120,103 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=["user", "author"],
                                     name="uniq_follow"),
         )
+        # uniq_follow serves lookups by user, this one fan-out by author.
+        indexes = (
+            models.Index(fields=["author", "user"],
+                         name="follow_author_user_idx"),
+        )
 
     def __str__(self):
         return str(self.user.username)
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Читатель"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост"
+    )
+    pub_date = models.DateTimeField("date published")
+
+    class Meta:
+        ordering = ("-pub_date",)
+        constraints = (
+            models.UniqueConstraint(fields=["user", "post"],
+                                    name="uniq_timeline_entry"),
+        )
+        indexes = (
+            models.Index(fields=["user", "pub_date", "post"],
+                         name="timeline_user_date_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.user_id}:{self.post_id}"
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Автор"
+    )
+    posts_count = models.IntegerField("записей", default=0)
+    followers_count = models.IntegerField("подписчиков", default=0)
+    following_count = models.IntegerField("подписок", default=0)
+
+    def __str__(self):
+        return str(self.author_id)
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follow_suggestions",
+        verbose_name="Читатель"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="suggested_to",
+        verbose_name="Предложенный автор"
+    )
+    score = models.FloatField("вес")
+
+    class Meta:
+        ordering = ("-score",)
+        constraints = (
+            models.UniqueConstraint(fields=["user", "author"],
+                                    name="uniq_follow_suggestion"),
+        )
+        # Suggestions are read best first, see posts.recommendations.
+        indexes = (
+            models.Index(fields=["user", "-score"],
+                         name="suggestion_user_score_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.user_id}:{self.author_id}"
+
+
+class SuggestionRefresh(models.Model):
+    """A user whose follow suggestions are out of date."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+        verbose_name="Читатель"
+    )
+
+    def __str__(self):
+        return str(self.user_id)
@@ -0,0 +1,147 @@
+"""Full-page cache of the feed pages anonymous readers see.
+
+A cached page is tagged with every ``posts.feed_cache`` version read while
+rendering it: its list, and the post, author, group and stats scopes of
+everything it shows. These are its surrogate keys. The signals behind
+posting, editing, commenting and following already bump exactly those
+scopes, which purges the pages that show the change and no others. A hit
+costs one cache round trip for the page and one for its tags, and never
+reaches the ORM.
+
+Logged-in readers share a cached shell of the page instead, rendered with
+``posts.holes`` markers where it depends on the reader. A hit fills the
+holes for the reader, so it costs the session and user lookups plus one
+batched Follow query at most.
+
+Browsers holding the read-your-writes pin cookie are not served from the
+cache. Pages rendered from a replica are kept only for
+``REPLICA_PIN_SECONDS``, since the replica may have been behind.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import parse_http_date_safe
+
+from yatube import routers
+
+from . import feed_cache, holes, metrics
+from .paginator import CursorPaginator
+
+# Bumped with every card change, the specific card scopes are enough.
+BROAD_SCOPES = {"cards"}
+
+
+def _key(request, kind="page"):
+    # Only the paging parameters select content, anything else in the
+    # query string must not make a new entry.
+    path = hashlib.md5(request.path.encode()).hexdigest()
+    page = CursorPaginator([], 1).normalize(request.GET)
+    return f"{kind}-{path}-{page}"
+
+
+def cacheable(request):
+    match = request.resolver_match
+    return (
+        request.method in ("GET", "HEAD")
+        and not routers.is_pinned(request)
+        and match is not None
+        and match.view_name in settings.PAGE_CACHE_VIEWS
+    )
+
+
+def anonymous(request):
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def _current(key, cache_name):
+    """Return the cached response under ``key`` if its tags are current."""
+    entry = cache.get(key)
+    if entry is not None:
+        tags = entry["tags"]
+        if feed_cache.get_versions(*tags) != tags:
+            entry = None
+    metrics.cache_lookup(cache_name, entry is not None)
+    return entry and entry["response"]
+
+
+def lookup(request):
+    """Return the cached anonymous response for ``request``."""
+    response = _current(_key(request), "page")
+    if response is None:
+        return None
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=parse_http_date_safe(
+            response.get("Last-Modified", "")
+        ),
+        response=response,
+    )
+
+
+def store(request, response, versions, key=None):
+    tags = {
+        scope: version for scope, version in versions.items()
+        if scope not in BROAD_SCOPES
+    }
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or not tags
+        or None in tags.values()
+    ):
+        return
+    cache.set(
+        key or _key(request), {"response": response, "tags": tags},
+        routers.cache_timeout(settings.PAGE_CACHE_TIMEOUT)
+    )
+
+
+def shell(request, view_func, view_args, view_kwargs):
+    """Return the page for a logged-in reader, built on a cached shell."""
+    key = _key(request, "shell")
+    response = _current(key, "shell")
+    if response is None:
+        with feed_cache.recording() as versions, holes.shell():
+            response = view_func(request, *view_args, **view_kwargs)
+        store(request, response, versions, key)
+    if response.status_code != 200 or response.streaming:
+        return response
+    response.content = holes.fill(
+        request, response.content.decode(response.charset)
+    )
+    # Validators of the shell would match every reader's page.
+    del response["ETag"]
+    del response["Last-Modified"]
+    set_response_etag(response)
+    return get_conditional_response(
+        request, etag=response["ETag"], response=response
+    )
+
+
+class AnonymousPageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with feed_cache.recording() as versions:
+            response = self.get_response(request)
+        if getattr(request, "_page_cache_miss", False):
+            store(request, response, versions)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not cacheable(request):
+            return None
+        if not anonymous(request):
+            if not request.user.is_authenticated:
+                return None
+            return shell(request, view_func, view_args, view_kwargs)
+        response = lookup(request)
+        if response is None:
+            request._page_cache_miss = True
+        return response
@@ -0,0 +1,217 @@
+"""Keyset (cursor) pagination for post lists.
+
+Pages are addressed with opaque, signed ``?after=``/``?before=`` tokens
+that carry the ``(pub_date, id)`` key of the boundary row, so every page
+is a single indexed range scan with a ``LIMIT`` and no ``COUNT(*)``. Legacy
+``?page=N`` links keep working up to ``PAGINATOR_MAX_PAGE``.
+``page_window`` picks the few page numbers worth linking around a page.
+"""
+import base64
+import binascii
+import math
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.core.signing import BadSignature, Signer
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_KEYS = ("pub_date", "id")
+
+
+# Tokens are signed: each valid one is a cache key of its own, so only
+# the boundaries of pages actually served may be requested.
+_signer = Signer(salt="posts.paginator")
+
+
+def encode_token(number, row, keys=DEFAULT_KEYS):
+    pub_date, pk = _row_key(row, keys)
+    raw = f"{number}|{pub_date.isoformat()}|{pk}".encode()
+    return _signer.sign(base64.urlsafe_b64encode(raw).decode().rstrip("="))
+
+
+def decode_token(token):
+    if not token:
+        return None
+    try:
+        token = _signer.unsign(token)
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        number, pub_date, pk = raw.decode().split("|")
+        key = (int(number), parse_datetime(pub_date), int(pk))
+    except (BadSignature, binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if key[1] is None:
+        return None
+    return key
+
+
+def _row_key(row, keys=DEFAULT_KEYS):
+    if isinstance(row, dict):
+        return tuple(row[key] for key in keys)
+    return tuple(getattr(row, key) for key in keys)
+
+
+class CursorPaginator(Paginator):
+    """Paginator that never counts rows.
+
+    The key is taken from the queryset ordering when it consists of two
+    descending fields (e.g. the timeline ordering), otherwise posts are
+    ordered by ``keys`` (``(pub_date, id)`` unless given, e.g.
+    ``("created", "id")`` for comments); rows must carry ``keys`` as
+    attributes or dict items. ``num_pages`` only reflects what is
+    known from the last built page: the current number plus one when
+    more rows follow.
+    """
+
+    def __init__(self, object_list, per_page, max_page=None, keys=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.max_page = max_page or settings.PAGINATOR_MAX_PAGE
+        self.row_keys = keys or DEFAULT_KEYS
+        self.keys = self._ordering_keys(object_list) or self.row_keys
+        self._known_pages = None
+
+    @staticmethod
+    def _ordering_keys(object_list):
+        ordering = getattr(object_list, "query", None)
+        ordering = ordering.order_by if ordering is not None else ()
+        if len(ordering) == 2 and all(f.startswith("-") for f in ordering):
+            return tuple(field[1:] for field in ordering)
+        return None
+
+    @property
+    def num_pages(self):
+        if self._known_pages is None:
+            return super().num_pages
+        return self._known_pages
+
+    def _ordered(self, descending=True):
+        prefix = "-" if descending else ""
+        return self.object_list.order_by(
+            *(prefix + key for key in self.keys)
+        )
+
+    def _beyond(self, pub_date, pk, older):
+        date_key, id_key = self.keys
+        op = "lt" if older else "gt"
+        return (
+            Q(**{f"{date_key}__{op}": pub_date})
+            | Q(**{date_key: pub_date, f"{id_key}__{op}": pk})
+        )
+
+    def normalize(self, params):
+        """Return a canonical string for the page requested by ``params``.
+
+        Useful as a cache key: unknown or malformed values collapse onto
+        the first page instead of producing a new key each.
+        """
+        for name in ("after", "before"):
+            if decode_token(params.get(name)) is not None:
+                return f"{name}-{params[name]}"
+        return f"page-{self._page_number(params.get('page'))}"
+
+    def _page_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return 1
+        return min(max(number, 1), self.max_page)
+
+    def page_from(self, params):
+        """Build the page addressed by request ``params``."""
+        after = decode_token(params.get("after"))
+        before = decode_token(params.get("before"))
+        per_page = self.per_page
+        if after is not None:
+            number, pub_date, pk = after
+            rows = list(self._ordered().filter(
+                self._beyond(pub_date, pk, older=True)
+            )[:per_page + 1])
+            has_next, has_previous = len(rows) > per_page, True
+            number += 1
+        elif before is not None:
+            number, pub_date, pk = before
+            rows = list(self._ordered(descending=False).filter(
+                self._beyond(pub_date, pk, older=False)
+            )[:per_page + 1])
+            has_next, has_previous = True, len(rows) > per_page
+            rows = rows[:per_page][::-1]
+            number -= 1
+        else:
+            number = self._page_number(params.get("page"))
+            offset = (number - 1) * per_page
+            rows = list(self._ordered()[offset:offset + per_page + 1])
+            if not rows and number > 1:
+                # Past the end: count once and show the last page instead,
+                # like Paginator.get_page.
+                number = max(math.ceil(self.object_list.count() / per_page), 1)
+                offset = (number - 1) * per_page
+                rows = list(self._ordered()[offset:offset + per_page + 1])
+            has_next, has_previous = len(rows) > per_page, number > 1
+        rows = rows[:per_page]
+        number = max(number, 2) if has_previous else 1
+        self._known_pages = number + 1 if has_next else number
+
+        page = Page(rows, number, self)
+        page.next_token = page.previous_token = None
+        if rows and has_next:
+            page.next_token = encode_token(number, rows[-1], self.row_keys)
+        if rows and has_previous:
+            page.previous_token = encode_token(
+                number, rows[0], self.row_keys
+            )
+        return page
+
+    def snapshot(self, page):
+        """Return a compact, picklable description of ``page``."""
+        return {
+            "ids": [
+                _row_key(row, self.row_keys)[1] for row in page.object_list
+            ],
+            "number": page.number,
+            "pages": self._known_pages,
+            "next_token": page.next_token,
+            "previous_token": page.previous_token,
+        }
+
+    def restore(self, snapshot):
+        """Rebuild a page from :meth:`snapshot`, re-reading its rows.
+
+        Rows deleted since the snapshot was taken are skipped.
+        """
+        rows = self.object_list.in_bulk(snapshot["ids"])
+        self._known_pages = snapshot["pages"]
+        page = Page(
+            [rows[pk] for pk in snapshot["ids"] if pk in rows],
+            snapshot["number"],
+            self
+        )
+        page.next_token = snapshot["next_token"]
+        page.previous_token = snapshot["previous_token"]
+        return page
+
+
+def page_window(page, total=None, size=None):
+    """Return the page numbers to link around ``page``, ``None`` for gaps.
+
+    Links stay within ``size`` pages of the current one, plus the first
+    and the last page. The last page is only known from ``total``, a row
+    count kept elsewhere such as author stats; without one the window
+    ends at the next page. ``?page=N`` links beyond ``max_page`` are not
+    offered.
+    """
+    size = settings.PAGINATOR_WINDOW if size is None else size
+    max_page = getattr(page.paginator, "max_page", None) or math.inf
+    last = page.number + 1 if page.has_next() else page.number
+    if total is not None:
+        last = max(last, math.ceil(total / page.paginator.per_page))
+    last = min(last, max_page)
+    numbers = sorted({1, last, page.number} | set(range(
+        max(page.number - size, 1), min(page.number + size, last) + 1
+    )))
+    window = []
+    for number in numbers:
+        if window and number > window[-1] + 1:
+            window.append(None)
+        window.append(number)
+    return window
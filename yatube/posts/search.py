@@ -0,0 +1,87 @@
+"""Full-text search over ``Post.text``.
+
+On SQLite the text is mirrored into the ``posts_post_fts`` FTS5 table by
+triggers, so lookups are index matches instead of ``LIKE '%...%'`` scans.
+Other backends fall back to ``icontains``.
+"""
+import re
+
+from django.db import connection
+
+from .models import Post
+
+FTS_TABLE = "posts_post_fts"
+
+INSTALL_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF text ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+UNINSTALL_SQL = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+
+def uses_fts(using=connection):
+    return using.vendor == "sqlite"
+
+
+def install(schema_editor):
+    """Create (or repair) the FTS table and its triggers, then reindex.
+
+    SQLite drops triggers when a migration rebuilds ``posts_post``, so this
+    is also what the ``rebuild_search_index`` command runs.
+    """
+    if uses_fts(schema_editor.connection):
+        for statement in INSTALL_SQL:
+            schema_editor.execute(statement)
+
+
+def uninstall(schema_editor):
+    if uses_fts(schema_editor.connection):
+        for statement in UNINSTALL_SQL:
+            schema_editor.execute(statement)
+
+
+def terms(query):
+    return re.findall(r"\w+", query or "")[:16]
+
+
+def search_posts(query, queryset=None):
+    """Return posts whose text contains every word of ``query``.
+
+    Each word matches as a prefix, so ``пост`` finds ``постов``.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    if not uses_fts():
+        for word in words:
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+    match = " ".join(f'"{word}"*' for word in words)
+    # RawSQL under id__in is wrapped in a second pair of parentheses,
+    # which SQLite reads as a scalar subquery returning its first row.
+    return queryset.extra(
+        where=[
+            f'"{Post._meta.db_table}"."id" IN '
+            f"(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)"
+        ],
+        params=[match],
+    )
@@ -0,0 +1,136 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (feed_cache, lookups, recommendations, stats, thumbnails,
+               timeline)
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, raw=False, **kwargs):
+    # An edit that moves a post to another group changes two group feeds.
+    instance._previous_group_id = None
+    if not instance._state.adding and not raw:
+        instance._previous_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list("group_id", flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance.author_id, instance.group_id
+    ))
+    feed_cache.bump_cards(f"post-{instance.pk}")
+    previous_group_id = getattr(instance, "_previous_group_id", None)
+    if previous_group_id not in (None, instance.group_id):
+        feed_cache.bump(f"group-{previous_group_id}")
+    if instance.image:
+        thumbnails.enqueue(instance.pk)
+    if created:
+        stats.bump(instance.author_id, posts_count=1)
+        feed_cache.bump(f"stats-{instance.author_id}")
+        timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance.author_id, instance.group_id
+    ))
+    feed_cache.bump_cards(f"post-{instance.pk}")
+    stats.bump(instance.author_id, posts_count=-1)
+    feed_cache.bump(f"stats-{instance.author_id}")
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.bump(instance.author_id, followers_count=1)
+        stats.bump(instance.user_id, following_count=1)
+        feed_cache.bump(
+            f"stats-{instance.author_id}", f"stats-{instance.user_id}"
+        )
+        timeline.followers_changed(instance.author_id, 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        recommendations.mark_stale(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    stats.bump(instance.author_id, followers_count=-1)
+    stats.bump(instance.user_id, following_count=-1)
+    feed_cache.bump(f"stats-{instance.author_id}", f"stats-{instance.user_id}")
+    timeline.followers_changed(instance.author_id, -1)
+    timeline.retract(instance.user_id, instance.author_id)
+    recommendations.mark_stale(instance.user_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1
+        )
+        feed_cache.bump_cards(f"post-{instance.post_id}")
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1
+    )
+    feed_cache.bump_cards(f"post-{instance.post_id}")
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, **kwargs):
+    # A rename leaves the old username in the lookup cache.
+    instance._previous_username = None
+    if not instance._state.adding and not raw:
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list("username", flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields=None, **kwargs):
+    lookups.forget_user(
+        instance.username, getattr(instance, "_previous_username", None)
+    )
+    # Logging in only touches last_login, which no card shows.
+    if not created and update_fields != frozenset(["last_login"]):
+        feed_cache.bump_cards(f"author-{instance.pk}")
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    lookups.forget_user(instance.username)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = None
+    if not instance._state.adding and not raw:
+        instance._previous_slug = Group.objects.filter(
+            pk=instance.pk
+        ).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    lookups.forget_group(
+        instance.slug, getattr(instance, "_previous_slug", None)
+    )
+    feed_cache.bump("groups")
+    if not created:
+        feed_cache.bump_cards(f"group-card-{instance.pk}")
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    lookups.forget_group(instance.slug)
+    feed_cache.bump("groups")
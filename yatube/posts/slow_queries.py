@@ -0,0 +1,116 @@
+"""Log of SQL statements slower than ``SLOW_QUERY_THRESHOLD`` seconds.
+
+Every database connection gets an execute wrapper that times statements.
+Slow ones are appended as JSON lines to ``SLOW_QUERY_LOG`` with the view
+being served and the innermost project frame that issued them. On SQLite
+the ``EXPLAIN QUERY PLAN`` of a slow ``SELECT`` is attached and full scans
+of ``SLOW_QUERY_WATCHED_TABLES`` are flagged. The ``slow_queries`` command
+summarizes the log.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_write_lock = threading.Lock()
+_SKIPPED_FRAMES = (
+    os.path.join("django", ""),
+    os.path.join("site-packages", ""),
+    os.path.join("yatube", "sqlite", ""),  # the database backend
+    __file__,
+)
+
+
+def origin():
+    """Return ``file:line in function`` of the innermost project frame."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(settings.BASE_DIR) and not any(
+            part in frame.filename for part in _SKIPPED_FRAMES
+        ):
+            path = os.path.relpath(frame.filename, settings.BASE_DIR)
+            return f"{path}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def query_plan(connection, sql, params):
+    """Return the ``EXPLAIN QUERY PLAN`` lines of a SQLite ``SELECT``."""
+    if connection.vendor != "sqlite" or not sql.lstrip().upper().startswith(
+        "SELECT"
+    ):
+        return []
+    # A cursor of its own: the statement's results are not fetched yet,
+    # and create_cursor() bypasses the execute wrappers.
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def full_scans(plan):
+    """Return the watched tables that ``plan`` reads without an index."""
+    tables = "|".join(map(re.escape, settings.SLOW_QUERY_WATCHED_TABLES))
+    pattern = re.compile(rf"^SCAN (?:TABLE )?({tables})\b(?!.*\bINDEX\b)")
+    return sorted({
+        match.group(1) for match in map(pattern.match, plan) if match
+    })
+
+
+def record(connection, sql, params, seconds):
+    try:
+        plan = query_plan(connection, sql, params)
+    except Exception:
+        logger.exception("EXPLAIN QUERY PLAN failed")
+        plan = []
+    entry = {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "ms": round(seconds * 1000, 3),
+        "view": metrics.current_view(),
+        "origin": origin(),
+        "sql": sql,
+        "params": [str(param)[:100] for param in params or ()],
+        "plan": plan,
+        "full_scans": full_scans(plan),
+    }
+    logger.warning(
+        "Slow query (%.1f ms) in %s: %s", entry["ms"], entry["view"], sql
+    )
+    # Runs after the statement succeeded, which a bad log path must not
+    # turn into a failed request.
+    try:
+        with _write_lock, open(settings.SLOW_QUERY_LOG, "a") as log:
+            log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except Exception:
+        logger.exception("Writing %s failed", settings.SLOW_QUERY_LOG)
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if threshold is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        if seconds >= threshold and not many:
+            record(context["connection"], sql, params, seconds)
+
+
+@receiver(connection_created)
+def install(sender, connection, **kwargs):
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
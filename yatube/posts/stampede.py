@@ -0,0 +1,69 @@
+"""Stampede-safe recomputation of cached values.
+
+``fetch`` stores a value together with the version it was computed for,
+how long computing it took and when it goes stale. When it is stale, or
+its version moved on, one caller takes a lock with ``cache.add`` and
+recomputes while the others keep serving the old value. Callers that
+must not see stale data wait for the new value instead.
+
+Entries are also refreshed a little before they go stale, with a chance
+that rises as expiry nears and with the cost of computing them
+(probabilistic early expiration, "XFetch"), so hot keys are usually
+rebuilt before anyone finds them stale.
+"""
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+HIT, STALE, MISS = "hit", "stale", "miss"
+
+
+def _fresh(entry, version):
+    if entry is None or entry["version"] != version:
+        return False
+    # XFetch: -log(random()) is exponentially distributed around 1.
+    early = entry["delta"] * settings.STAMPEDE_BETA * -math.log(
+        1 - random.random()
+    )
+    return time.time() + early < entry["expires"]
+
+
+def _compute(key, compute, timeout, version):
+    started = time.monotonic()
+    value = compute()
+    cache.set(key, {
+        "value": value,
+        "version": version,
+        "delta": time.monotonic() - started,
+        "expires": time.time() + timeout,
+    }, timeout + settings.STAMPEDE_STALE_TIMEOUT)
+    return value
+
+
+def fetch(key, compute, timeout, version=None, serve_stale=True):
+    """Return ``(value, result)``, computing ``value`` at most once at a
+    time per ``key``; ``result`` is ``HIT``, ``STALE`` or ``MISS``."""
+    entry = cache.get(key)
+    if _fresh(entry, version):
+        return entry["value"], HIT
+    lock = f"{key}-lock"
+    if cache.add(lock, True, settings.STAMPEDE_LOCK_TIMEOUT):
+        try:
+            return _compute(key, compute, timeout, version), MISS
+        finally:
+            cache.delete(lock)
+    if serve_stale and entry is not None:
+        return entry["value"], STALE
+    # Wait for the lock holder, then compute anyway if it never finishes.
+    deadline = time.monotonic() + settings.STAMPEDE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.STAMPEDE_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry["value"], HIT
+        if not cache.get(lock):
+            break
+    return _compute(key, compute, timeout, version), MISS
@@ -0,0 +1,51 @@
+"""Denormalized per-author counters shown in profile headers.
+
+Counters are moved with ``F()`` updates from model signals. A missing row
+means the counters were never computed; it is filled with exact counts on
+first read, and ``reconcile_author_stats`` repairs any drift.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Post
+
+FIELDS = ("posts_count", "followers_count", "following_count")
+
+
+def bump(author_id, **deltas):
+    """Move counters of an author, rows not computed yet are left alone."""
+    AuthorStats.objects.filter(pk=author_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def exact_counts(author_ids):
+    """Return ``{author_id: {field: value}}`` computed from the source rows."""
+    counts = {pk: dict.fromkeys(FIELDS, 0) for pk in author_ids}
+    sources = (
+        ("posts_count", Post.objects, "author_id"),
+        ("followers_count", Follow.objects, "author_id"),
+        ("following_count", Follow.objects, "user_id"),
+    )
+    for field, manager, column in sources:
+        rows = (
+            manager.filter(**{f"{column}__in": author_ids})
+            .order_by()
+            .values(column)
+            .annotate(total=Count("id"))
+            .values_list(column, "total")
+        )
+        for author_id, total in rows:
+            counts[author_id][field] = total
+    return counts
+
+
+def for_author(author_id):
+    stats = AuthorStats.objects.filter(pk=author_id).first()
+    if stats is None:
+        with transaction.atomic():
+            stats, _ = AuthorStats.objects.update_or_create(
+                author_id=author_id,
+                defaults=exact_counts([author_id])[author_id]
+            )
+    return stats
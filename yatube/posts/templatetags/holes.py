@@ -0,0 +1,20 @@
+from django import template
+
+from posts import holes
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **kwargs):
+    """Render ``holes/<name>.html``, or its marker while rendering a shell.
+
+    ``kwargs`` are all a filled hole knows about the page, keep them JSON
+    serializable.
+    """
+    if holes.rendering_shell():
+        return holes.marker(name, kwargs)
+    with context.push(**kwargs):
+        return context.template.engine.get_template(
+            holes.template_name(name)
+        ).render(context)
@@ -0,0 +1,29 @@
+from django import template
+
+from posts import paginator
+
+register = template.Library()
+
+PAGE_PARAMS = ("page", "after", "before")
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **params):
+    """Return the current query string with the paging parameters replaced.
+
+    Keeps filters such as the search ``q`` on pagination links.
+    """
+    query = context["request"].GET.copy()
+    for name in PAGE_PARAMS:
+        query.pop(name, None)
+    for name, value in params.items():
+        query[name] = value
+    return query.urlencode()
+
+
+@register.simple_tag
+def page_window(page, total=None):
+    """Page numbers to link around ``page``, see ``posts.paginator``."""
+    if not isinstance(total, int):
+        total = None
+    return paginator.page_window(page, total)
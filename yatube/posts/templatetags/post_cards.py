@@ -0,0 +1,45 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts import feed_cache, metrics, thumbnails
+from yatube import routers
+
+register = template.Library()
+
+
+def card_scopes(post):
+    scopes = [f"post-{post.id}", f"author-{post.author_id}"]
+    if post.group_id is not None:
+        scopes.append(f"group-card-{post.group_id}")
+    return scopes
+
+
+@register.simple_tag
+def post_card(post):
+    """Render the viewer-independent part of a post card, cached.
+
+    The key carries the versions of the post, its author and its group, so
+    edits, comments and renames only need to bump a version.
+    """
+    scopes = card_scopes(post)
+    versions = feed_cache.get_versions(*scopes)
+    key = routers.cache_key("post-card-{}-{}".format(
+        post.id, "-".join(str(versions[scope]) for scope in scopes)
+    ))
+    html = cache.get(key)
+    metrics.cache_lookup("post_card", html is not None)
+    if html is None:
+        html = render_to_string("posts/post_card.html", {"post": post})
+        cache.set(key, html, timeout=routers.cache_timeout(
+            settings.POST_CARD_CACHE_TIMEOUT
+        ))
+    return mark_safe(html)
+
+
+@register.simple_tag
+def ready_thumbnail(image, preset):
+    """Return the thumbnail of ``image`` if it was already generated."""
+    return thumbnails.ready_thumbnail(image, preset)
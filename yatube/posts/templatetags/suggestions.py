@@ -0,0 +1,13 @@
+from django import template
+
+from posts import recommendations
+
+register = template.Library()
+
+
+@register.simple_tag
+def follow_suggestions(user):
+    """The stored "who to follow" suggestions of a logged-in reader."""
+    if not user.is_authenticated:
+        return []
+    return recommendations.for_user(user.pk)
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..admin import ApproximateCountPaginator
+from ..models import Comment, Follow, Post, User
+
+
+@override_settings(ADMIN_COUNT_THRESHOLD=5)
+class AdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        cls.author = User.objects.create_user(username="Admined")
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.author) for i in range(8)
+        )
+        post = Post.objects.first()
+        Comment.objects.create(post=post, author=cls.author, text="к")
+        Follow.objects.create(user=cls.admin, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_admin_paginator_estimates_large_tables(self):
+        paginator = ApproximateCountPaginator(Post.objects.all(), 2)
+        last_pk = Post.objects.order_by("-pk").first().pk
+        self.assertEqual(paginator.count, last_pk)
+        with self.assertNumQueries(0):
+            ApproximateCountPaginator(Post.objects.all(), 2).count
+
+    def test_admin_paginator_caps_filtered_counts(self):
+        posts = Post.objects.filter(author=self.author)
+        self.assertEqual(ApproximateCountPaginator(posts, 2).count, 6)
+        with override_settings(ADMIN_COUNT_THRESHOLD=100):
+            cache.clear()
+            self.assertEqual(ApproximateCountPaginator(posts, 2).count, 8)
+
+    def test_admin_changelists_skip_the_unfiltered_count(self):
+        for model in ("post", "group", "comment", "follow"):
+            with self.subTest(model=model):
+                response = self.client.get(
+                    reverse(f"admin:posts_{model}_changelist")
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIsNone(response.context["cl"].full_result_count)
+
+    def test_admin_forms_do_not_list_every_user(self):
+        for model in ("post", "comment", "follow"):
+            with self.subTest(model=model):
+                response = self.client.get(
+                    reverse(f"admin:posts_{model}_add")
+                )
+                self.assertNotContains(response, "Admined")
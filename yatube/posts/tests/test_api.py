@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Reader")
+        cls.author = User.objects.create_user(username="Writer")
+        cls.group = Group.objects.create(
+            title="Группа", slug="api-group", description="Описание"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.author, group=cls.group)
+            for i in range(25)
+        )
+        cls.post = Post.objects.create(text="Последний", author=cls.author)
+        Comment.objects.create(post=cls.post, author=cls.user, text="Ура")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, name, params=None, **kwargs):
+        return self.client.get(reverse(f"api:{name}", kwargs=kwargs), params)
+
+    def test_api_posts_are_cursor_paginated(self):
+        first = self.get("posts").json()
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual(first["results"][0]["text"], "Последний")
+        self.assertEqual(first["results"][0]["author"], "Writer")
+        self.assertEqual(first["results"][0]["comment_count"], 1)
+        self.assertEqual(len(first["results"]), 20)
+        self.assertEqual(len(second["results"]), 6)
+        self.assertIsNone(second["next"])
+        self.assertIsNotNone(second["previous"])
+
+    def test_api_fields_select_a_subset(self):
+        response = self.get("post", {"fields": "id,text"},
+                            post_id=self.post.id)
+
+        self.assertEqual(
+            response.json(), {"id": self.post.id, "text": "Последний"}
+        )
+        self.assertEqual(
+            self.get("posts", {"fields": "id,secret"}).status_code,
+            HTTPStatus.BAD_REQUEST
+        )
+
+    def test_api_detail_endpoints(self):
+        profile = self.get("profile", username="Writer").json()
+        group = self.get("group", slug="api-group").json()
+        comments = self.get("comments", post_id=self.post.id).json()
+
+        self.assertEqual(profile["posts_count"], 26)
+        self.assertEqual(group["title"], "Группа")
+        self.assertEqual(len(self.get(
+            "group_posts", slug="api-group").json()["results"]), 20)
+        self.assertEqual(comments["results"][0]["author"], "Reader")
+        self.assertEqual(
+            self.get("profile", username="Nobody").status_code,
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_api_responses_revalidate(self):
+        response = self.get("posts")
+        self.assertEqual(
+            self.client.get(
+                reverse("api:posts"), HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+            HTTPStatus.NOT_MODIFIED
+        )
+
+        Post.objects.create(text="Новый", author=self.author)
+
+        self.assertEqual(
+            self.client.get(
+                reverse("api:posts"), HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+            HTTPStatus.OK
+        )
+
+    def test_api_follow_feed_requires_login(self):
+        self.assertEqual(self.get("follow").status_code,
+                         HTTPStatus.UNAUTHORIZED)
+        Follow.objects.create(user=self.user, author=self.author)
+        self.client.force_login(self.user)
+
+        results = self.get("follow").json()["results"]
+
+        self.assertEqual(results[0]["text"], "Последний")
+
+    def test_api_follow_feed_next_page_with_several_followers(self):
+        other = User.objects.create_user(username="Other")
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        self.client.force_login(self.user)
+
+        first = self.get("follow").json()
+        second = self.client.get(first["next"]).json()
+
+        texts = [row["text"] for row in first["results"] + second["results"]]
+        self.assertEqual(len(second["results"]), 6)
+        self.assertEqual(len(set(texts)), 26)
+        self.assertIsNone(second["next"])
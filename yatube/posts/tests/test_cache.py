@@ -0,0 +1,113 @@
+import os
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase
+
+from yatube.cache import TwoTierCache
+
+from .. import lookups
+from ..models import Group, User
+
+
+class TwoTierCacheTest(SimpleTestCase):
+    """Two backend instances on one file stand in for two processes."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, "cache.sqlite3")
+        self.first = self.backend()
+        self.second = self.backend()
+
+    def backend(self, **options):
+        return TwoTierCache(self.location, {"OPTIONS": {
+            "LOCAL_MAX_ENTRIES": 2, "INVALIDATION_POLL_INTERVAL": 0,
+            **options,
+        }})
+
+    def test_cache_round_trips_values(self):
+        self.first.set_many({"a": [1, 2], "b": None})
+        self.first.set("c", {"key": "value"}, timeout=None)
+        self.assertEqual(
+            self.second.get_many(["a", "b", "c", "missing"]),
+            {"a": [1, 2], "b": None, "c": {"key": "value"}}
+        )
+        self.assertTrue(self.second.has_key("b"))
+        self.first.delete("a")
+        self.assertIsNone(self.second.get("a"))
+
+    def test_cache_local_tier_is_bounded_lru(self):
+        self.first.set_many({"a": 1, "b": 2})
+        self.first.get("a")
+        self.first.set("c", 3)
+        self.assertEqual(list(self.first._lru), [":1:a", ":1:c"])
+        # Evicted locally, still served from the shared tier.
+        self.assertEqual(self.first.get("b"), 2)
+
+    def test_cache_writes_invalidate_other_processes(self):
+        self.first.set("key", "old")
+        self.assertEqual(self.second.get("key"), "old")
+        self.first.set("key", "new")
+        self.assertEqual(self.second.get("key"), "new")
+        self.first.clear()
+        self.assertIsNone(self.second.get("key"))
+
+    def test_cache_stale_local_entries_live_until_poll(self):
+        slow = self.backend(INVALIDATION_POLL_INTERVAL=60)
+        self.first.set("key", "old")
+        self.assertEqual(slow.get("key"), "old")
+        self.first.set("key", "new")
+        self.assertEqual(slow.get("key"), "old")
+        slow._polled = 0
+        self.assertEqual(slow.get("key"), "new")
+
+    def test_cache_add_is_atomic_across_processes(self):
+        self.assertTrue(self.first.add("lock", "first", timeout=60))
+        self.assertFalse(self.second.add("lock", "second", timeout=60))
+        self.assertEqual(self.second.get("lock"), "first")
+
+    def test_cache_expired_entries_are_replaced(self):
+        self.first.set("key", "old", timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.second.get("key"))
+        self.assertTrue(self.second.add("key", "new"))
+        self.assertEqual(self.first.get("key"), "new")
+
+
+class LookupCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="looked-up")
+        cls.group = Group.objects.create(title="Группа", slug="looked-up")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups_cache_hits(self):
+        lookups.user_or_404("looked-up")
+        lookups.group_or_404("looked-up")
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.user_or_404("looked-up"), self.user)
+            self.assertEqual(lookups.group_or_404("looked-up"), self.group)
+
+    def test_lookups_raise_404(self):
+        with self.assertRaises(Http404):
+            lookups.group_or_404("missing")
+        with self.assertRaises(Http404):
+            lookups.user_or_404("missing")
+
+    def test_lookups_forget_renamed_and_deleted_rows(self):
+        lookups.group_or_404("looked-up")
+        self.group.slug = "renamed"
+        self.group.save()
+        with self.assertRaises(Http404):
+            lookups.group_or_404("looked-up")
+        self.assertEqual(lookups.group_or_404("renamed").slug, "renamed")
+        lookups.user_or_404("looked-up")
+        self.user.delete()
+        with self.assertRaises(Http404):
+            lookups.user_or_404("looked-up")
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import metrics
+from ..models import Post, User
+
+METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DB=os.path.join(METRICS_DIR, "metrics.sqlite3"))
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username="Staff", is_staff=True)
+        cls.user = User.objects.create_user(username="Plain")
+        Post.objects.create(text="Пост", author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        metrics.clear()
+
+    def test_metrics_record_views_and_caches(self):
+        self.client.get(reverse("index"))
+        self.client.get(reverse("index"))
+        self.client.force_login(self.staff)
+
+        text = self.client.get(reverse("metrics")).content.decode()
+
+        self.assertIn("# TYPE yatube_request_duration_seconds histogram",
+                      text)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket{view="index",le="+Inf"} 2',
+            text
+        )
+        self.assertIn('yatube_request_duration_seconds_count{view="index"} 2',
+                      text)
+        self.assertIn('yatube_db_queries_total{view="index"}', text)
+        self.assertIn('yatube_template_render_seconds_total{view="index"}',
+                      text)
+        # The anonymous repeat is answered by the page cache.
+        self.assertIn(
+            'yatube_cache_requests_total{cache="page",result="hit"} 1', text
+        )
+        self.assertIn(
+            'yatube_cache_requests_total{cache="page",result="miss"} 1', text
+        )
+        self.assertIn(
+            'yatube_cache_requests_total{cache="feed_page",result="miss"} 1',
+            text
+        )
+
+    def test_metrics_are_summed_across_flushes(self):
+        metrics.observe_request("index", 0.02, 3, 0.01, 0.005)
+        metrics.flush()
+        metrics.observe_request("index", 0.2, 1, 0.01, 0.005)
+
+        text = metrics.render()
+
+        self.assertIn('yatube_db_queries_total{view="index"} 4', text)
+        bucket = (
+            'yatube_request_duration_seconds_bucket{{view="index",le="{}"}}'
+        )
+        self.assertIn(bucket.format(0.025) + " 1", text)
+        self.assertIn(bucket.format(0.25) + " 2", text)
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_metrics_failing_store_keeps_counters_and_requests(self):
+        with override_settings(METRICS_DB=METRICS_DIR), \
+                self.assertLogs("posts.metrics", "ERROR"):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        text = metrics.render()
+
+        self.assertIn('yatube_request_duration_seconds_count{view="index"} 1',
+                      text)
+
+    def test_metrics_are_staff_only(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
@@ -1,6 +1,9 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post, User
+from ..models import Comment, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -37,3 +40,45 @@ class GroupModelTest(TestCase):
         expected_group_title = group.title
 
         self.assertEqual(expected_group_title, "testgroup")
+
+
+class CommentCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Commenter")
+        cls.post = Post.objects.create(text="Пост", author=cls.user)
+
+    def test_models_comment_count_follows_comments(self):
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text="Первый"
+        )
+        Comment.objects.create(post=self.post, author=self.user, text="Второй")
+        comment.delete()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_models_edit_keeps_concurrent_comment_count(self):
+        post = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(post=self.post, author=self.user, text="Я")
+        post.text = "Исправленный пост"
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.text, "Исправленный пост")
+        self.assertEqual(post.comment_count, 1)
+
+    def test_models_backfill_comment_counts(self):
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text=str(i))
+            for i in range(3)
+        )
+
+        call_command(
+            "backfill_comment_counts", chunk_size=1, pause=0,
+            stdout=StringIO()
+        )
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
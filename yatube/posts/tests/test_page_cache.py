@@ -0,0 +1,172 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import resolve, reverse
+
+from yatube import routers
+
+from .. import page_cache
+from ..models import Comment, Follow, Group, Post, User
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Cached")
+        cls.reader = User.objects.create_user(username="CachedReader")
+        cls.group = Group.objects.create(title="Группа", slug="cached")
+        cls.other = Group.objects.create(title="Другая", slug="other")
+        cls.post = Post.objects.create(
+            text="Пост", author=cls.author, group=cls.group
+        )
+        Post.objects.create(text="Чужой", author=cls.reader, group=cls.other)
+        cls.urls = {
+            "index": reverse("index"),
+            "group": reverse("group_posts", kwargs={"slug": "cached"}),
+            "other": reverse("group_posts", kwargs={"slug": "other"}),
+            "profile": reverse("profile", kwargs={"username": "Cached"}),
+            "post": reverse("post", kwargs={
+                "username": "Cached", "post_id": cls.post.id
+            }),
+        }
+
+    def setUp(self):
+        cache.clear()
+        for url in self.urls.values():
+            self.client.get(url)
+
+    def assertCached(self, name):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(self.urls[name]).status_code, HTTPStatus.OK
+            )
+
+    def assertPurged(self, name):
+        with self.assertRaises(AssertionError):
+            self.assertCached(name)
+
+    def test_page_cache_serves_anonymous_pages_without_queries(self):
+        for name in self.urls:
+            with self.subTest(name=name):
+                self.assertCached(name)
+
+    def test_page_cache_answers_conditional_requests(self):
+        etag = self.client.get(self.urls["index"])["ETag"]
+        response = self.client.get(self.urls["index"], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_page_cache_keys_ignore_other_query_parameters(self):
+        for query in ("?junk=1", "?page=1&junk=2", "?page=junk"):
+            with self.subTest(query=query):
+                with self.assertNumQueries(0):
+                    self.client.get(self.urls["index"] + query)
+
+    def test_page_cache_skips_api_routes(self):
+        for url in (self.urls["profile"],
+                    reverse("api:profile", kwargs={"username": "Cached"})):
+            request = RequestFactory().get(url)
+            request.resolver_match = resolve(url)
+            with self.subTest(url=url):
+                self.assertEqual(
+                    page_cache.cacheable(request),
+                    not url.startswith("/api/")
+                )
+
+    def test_page_cache_skips_sessions_and_pinned_browsers(self):
+        logged_in = Client()
+        logged_in.force_login(self.reader)
+        pinned = Client()
+        pinned.cookies[routers.PIN_COOKIE] = "1"
+        for client in (logged_in, pinned):
+            client.get(self.urls["index"])
+            with self.assertRaises(AssertionError):
+                with self.assertNumQueries(0):
+                    client.get(self.urls["index"])
+
+    def test_page_cache_comment_purges_pages_showing_the_post(self):
+        Comment.objects.create(post=self.post, author=self.reader, text="к")
+        for name in ("index", "group", "profile", "post"):
+            with self.subTest(name=name):
+                self.assertPurged(name)
+        self.assertCached("other")
+        self.assertContains(
+            self.client.get(self.urls["post"]), "Комментариев: 1"
+        )
+
+    def test_page_cache_follow_purges_profile(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertPurged("profile")
+        self.assertCached("index")
+
+    def test_page_cache_deleted_post_is_gone(self):
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(
+            self.client.get(self.urls["post"]).status_code,
+            HTTPStatus.NOT_FOUND
+        )
+        self.assertNotContains(self.client.get(self.urls["index"]), "Пост")
+
+
+class ShellCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="ShellAuthor")
+        cls.reader = User.objects.create_user(username="ShellReader")
+        cls.post = Post.objects.create(text="Пост", author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.edit_url = reverse("post_edit", kwargs={
+            "username": "ShellAuthor", "post_id": cls.post.id
+        })
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_shell_is_shared_and_holes_are_per_reader(self):
+        author_page = self.author_client.get(reverse("index"))
+        # The session and the user, the rest comes from the cached shell.
+        with self.assertNumQueries(2):
+            reader_page = self.reader_client.get(reverse("index"))
+        self.assertTemplateNotUsed(reader_page, "posts/index.html")
+        self.assertContains(author_page, self.edit_url)
+        self.assertContains(author_page, "Пользователь: ShellAuthor.")
+        self.assertNotContains(reader_page, self.edit_url)
+        self.assertContains(reader_page, "Пользователь: ShellReader.")
+        self.assertNotContains(reader_page, "<!--hole")
+
+    def test_shell_follow_buttons_use_one_lookup(self):
+        url = reverse("profile", kwargs={"username": "ShellAuthor"})
+        self.author_client.get(url)
+        # Session, user, the follow buttons and the suggestions.
+        with self.assertNumQueries(4):
+            response = self.reader_client.get(url)
+        self.assertContains(response, "Отписаться")
+        Follow.objects.all().delete()
+        self.assertContains(self.reader_client.get(url), "Подписаться")
+
+    def test_shell_comment_form_has_readers_csrf_token(self):
+        url = reverse("post", kwargs={
+            "username": "ShellAuthor", "post_id": self.post.id
+        })
+        self.author_client.get(url)
+        response = self.reader_client.get(url)
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_shell_pages_answer_conditional_requests(self):
+        etag = self.reader_client.get(reverse("index"))["ETag"]
+        self.assertEqual(
+            self.reader_client.get(
+                reverse("index"), HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            HTTPStatus.NOT_MODIFIED
+        )
+        self.assertNotEqual(
+            self.author_client.get(reverse("index"))["ETag"], etag
+        )
@@ -0,0 +1,163 @@
+import base64
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, User
+from ..paginator import CursorPaginator, decode_token, page_window
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Paginated")
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user) for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def texts(self, page):
+        return [post.text for post in page]
+
+    def test_paginator_walks_forward_and_back_with_tokens(self):
+        first = self.client.get(reverse("index")).context["page"]
+        second = self.client.get(
+            reverse("index"), {"after": first.next_token}
+        ).context["page"]
+        third = self.client.get(
+            reverse("index"), {"after": second.next_token}
+        ).context["page"]
+        back = self.client.get(
+            reverse("index"), {"before": second.previous_token}
+        ).context["page"]
+
+        self.assertEqual(second.number, 2)
+        self.assertEqual(len(third), 5)
+        self.assertFalse(third.has_next())
+        self.assertEqual(self.texts(back), self.texts(first))
+        self.assertFalse(back.has_previous())
+        self.assertEqual(
+            len(set(self.texts(first) + self.texts(second)
+                    + self.texts(third))), 25
+        )
+
+    def test_paginator_does_not_count_rows(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        with self.assertNumQueries(1):
+            page = paginator.page_from({"page": "2"})
+            self.assertTrue(page.has_next())
+            self.assertTrue(page.has_previous())
+
+    @override_settings(PAGINATOR_MAX_PAGE=2)
+    def test_paginator_legacy_page_depth_is_bounded(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+
+        page = paginator.page_from({"page": "999"})
+
+        self.assertEqual(page.number, 2)
+        self.assertEqual(paginator.normalize({"page": "999"}), "page-2")
+        self.assertEqual(paginator.normalize({"page": "junk"}), "page-1")
+
+    def test_paginator_legacy_page_past_the_end_shows_last_page(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+
+        page = paginator.page_from({"page": "7"})
+
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(page_window(page, size=1), [1, 2, 3])
+
+    def test_paginator_rejects_malformed_tokens(self):
+        self.assertIsNone(decode_token("not-a-token"))
+        forged = base64.urlsafe_b64encode(
+            b"2|2021-08-01T00:00:00+00:00|7"
+        ).decode()
+        self.assertIsNone(decode_token(forged))
+        self.assertEqual(
+            CursorPaginator(Post.objects.all(), 10).normalize(
+                {"after": forged}
+            ),
+            "page-1"
+        )
+        page = CursorPaginator(Post.objects.all(), 10).page_from(
+            {"after": "not-a-token"}
+        )
+        self.assertEqual(page.number, 1)
+
+    def test_paginator_follow_feed_uses_timeline_keys(self):
+        reader = User.objects.create_user(username="Reader")
+        Follow.objects.create(user=reader, author=self.user)
+        self.client.force_login(reader)
+
+        first = self.client.get(reverse("follow_index")).context["page"]
+        second = self.client.get(
+            reverse("follow_index"), {"after": first.next_token}
+        ).context["page"]
+
+        self.assertEqual(first.paginator.keys, (
+            "entry_pub_date", "entry_post_id"
+        ))
+        self.assertEqual(len(second), 10)
+        self.assertFalse(set(self.texts(first)) & set(self.texts(second)))
+
+    def test_paginator_follow_feed_pages_with_several_followers(self):
+        readers = [
+            User.objects.create_user(username=f"Reader{i}") for i in range(3)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=self.user)
+        self.client.force_login(readers[0])
+
+        first = self.client.get(reverse("follow_index")).context["page"]
+        second = self.client.get(
+            reverse("follow_index"), {"after": first.next_token}
+        ).context["page"]
+        back = self.client.get(
+            reverse("follow_index"), {"before": second.previous_token}
+        ).context["page"]
+
+        self.assertEqual(self.texts(second), [
+            f"Пост {i}" for i in range(14, 4, -1)
+        ])
+        self.assertEqual(self.texts(back), self.texts(first))
+
+
+@override_settings(PAGINATOR_WINDOW=1, PAGINATOR_MAX_PAGE=20)
+class PageWindowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Windowed")
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user) for i in range(60)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def window(self, params, total=None):
+        page = CursorPaginator(Post.objects.all(), 5).page_from(params)
+        return page_window(page, total)
+
+    def test_paginator_window_without_total_ends_at_next_page(self):
+        self.assertEqual(self.window({}), [1, 2])
+        self.assertEqual(self.window({"page": 6}), [1, None, 5, 6, 7])
+
+    def test_paginator_window_with_total_is_bounded(self):
+        self.assertEqual(self.window({"page": 6}, 60), [1, None, 5, 6, 7,
+                                                        None, 12])
+        # Stale totals never hide pages known to exist.
+        self.assertEqual(self.window({"page": 6}, 5), [1, None, 5, 6, 7])
+        self.assertEqual(self.window({}, 10 ** 6), [1, 2, None, 20])
+
+    def test_paginator_profile_links_last_page_from_stats(self):
+        response = self.client.get(
+            reverse("profile", kwargs={"username": "Windowed"})
+        )
+        self.assertContains(response, "?page=6")
+        self.assertNotContains(response, "?page=5")
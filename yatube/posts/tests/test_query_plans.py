@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+from ..paginator import CursorPaginator
+from ..slow_queries import full_scans, query_plan
+
+
+class QueryPlanTest(TestCase):
+    """Every query behind the feeds must walk an index in order."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Planner")
+        cls.reader = User.objects.create_user(username="Reader")
+        cls.group = Group.objects.create(
+            title="Группа", slug="plans", description="Описание"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user, group=cls.group)
+            for i in range(15)
+        )
+        cls.post = Post.objects.create(text="Пост", author=cls.user)
+        Comment.objects.create(post=cls.post, author=cls.reader, text="к")
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertPlansUseIndexes(self, queries):
+        for query in queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or "posts_" not in sql:
+                continue
+            with self.subTest(sql=sql):
+                plan = query_plan(connection, sql, None)
+                self.assertEqual(full_scans(plan), [], plan)
+                self.assertFalse(
+                    [line for line in plan if "TEMP B-TREE" in line], plan
+                )
+
+    def test_query_plans_of_views(self):
+        self.client.force_login(self.reader)
+        first = self.client.get(reverse("index")).context["page"]
+        urls = (
+            reverse("index"),
+            f"{reverse('index')}?after={first.next_token}",
+            reverse("group_posts", kwargs={"slug": "plans"}),
+            reverse("profile", kwargs={"username": "Planner"}),
+            reverse("post", kwargs={
+                "username": "Planner", "post_id": self.post.id
+            }),
+            reverse("follow_index"),
+        )
+        for url in urls:
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(url)
+            self.assertPlansUseIndexes(captured.captured_queries)
+
+    def test_query_plans_of_follow_lookups(self):
+        with CaptureQueriesContext(connection) as captured:
+            list(Follow.objects.filter(author=self.user)
+                 .values_list("user_id", flat=True))
+            list(Comment.objects.filter(post=self.post))
+            CursorPaginator(
+                Comment.objects.filter(post=self.post), 10,
+                keys=("created", "id")
+            ).page_from({})
+        self.assertPlansUseIndexes(captured.captured_queries)
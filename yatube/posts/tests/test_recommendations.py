@@ -0,0 +1,119 @@
+import math
+import unittest
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import recommendations
+from ..models import Follow, FollowSuggestion, SuggestionRefresh, User
+
+
+@override_settings(FOLLOW_SUGGESTIONS_COFOLLOW_WEIGHT=0.5)
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader, cls.friend, cls.author, cls.peer, cls.other = (
+            User.objects.create_user(username=name)
+            for name in ("reader", "friend", "author", "peer", "other")
+        )
+        for user, author in (
+            (cls.reader, cls.friend),
+            (cls.friend, cls.author),
+            (cls.peer, cls.friend),
+            (cls.peer, cls.other),
+        ):
+            Follow.objects.create(user=user, author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def expected(self):
+        # The friend follows author; peer, who also follows the friend,
+        # follows other.
+        return [(1.0, self.author.id), (0.5 / math.sqrt(2), self.other.id)]
+
+    def rounded(self, suggestions):
+        return [(round(score, 6), pk) for score, pk in suggestions]
+
+    def test_recommendations_score_friends_of_friends_and_cofollows(self):
+        graph = recommendations.Graph.load()
+        scored = recommendations.score_python(
+            graph, [self.reader.id], 0.5, 10
+        )
+        self.assertEqual(
+            self.rounded(scored[self.reader.id]),
+            self.rounded(self.expected())
+        )
+
+    @unittest.skipIf(recommendations.numpy is None, "NumPy is not installed")
+    def test_recommendations_numpy_matches_python(self):
+        graph = recommendations.Graph.load()
+        user_ids = list(User.objects.values_list("id", flat=True))
+        python = recommendations.score_python(graph, user_ids, 0.5, 10)
+        vectorized = recommendations.score_numpy(graph, user_ids, 0.5, 10)
+        for user_id in user_ids:
+            self.assertEqual(
+                self.rounded(vectorized[user_id]),
+                self.rounded(python[user_id])
+            )
+
+    @unittest.skipIf(recommendations.numpy is None, "NumPy is not installed")
+    @override_settings(FOLLOW_SUGGESTIONS_BATCH_SIZE=2)
+    def test_recommendations_matrix_is_built_once_per_refresh(self):
+        with mock.patch.object(
+            recommendations, "Adjacency", wraps=recommendations.Adjacency
+        ) as adjacency:
+            recommendations.refresh(everyone=True)
+        adjacency.assert_called_once()
+        self.assertEqual(
+            [s.author_id for s in recommendations.for_user(self.reader.id)],
+            [self.author.id, self.other.id]
+        )
+
+    def test_recommendations_refresh_queued_readers_and_followers(self):
+        recommendations.refresh(everyone=True)
+        self.assertFalse(SuggestionRefresh.objects.exists())
+        self.assertEqual(
+            [s.author_id for s in recommendations.for_user(self.reader.id)],
+            [self.author.id, self.other.id]
+        )
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        # A followed author is no longer suggested, even before a refresh.
+        self.assertEqual(
+            [s.author_id for s in recommendations.for_user(self.reader.id)],
+            [self.other.id]
+        )
+        with mock.patch.object(
+            recommendations, "score", wraps=recommendations.score
+        ) as score:
+            recommendations.refresh()
+        # The reader follows nobody who follows them, only they changed.
+        self.assertEqual(list(score.call_args[0][1]), [self.reader.id])
+
+    def test_recommendations_shown_on_profile_and_follow_feed(self):
+        recommendations.refresh(everyone=True)
+        self.client.force_login(self.reader)
+        for url in (
+            reverse("profile", kwargs={"username": "peer"}),
+            reverse("follow_index"),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, "Кого почитать")
+                self.assertContains(
+                    response, reverse("profile", kwargs={"username": "author"})
+                )
+
+    def test_recommendations_command(self):
+        out = StringIO()
+        call_command("refresh_suggestions", "--all", stdout=out)
+        self.assertIn("Rescored 5 readers", out.getvalue())
+        self.assertTrue(
+            FollowSuggestion.objects.filter(user=self.reader).exists()
+        )
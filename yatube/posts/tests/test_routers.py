@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import resolve, reverse
+
+from yatube import routers
+
+from ..models import Post, User
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTest(SimpleTestCase):
+    """The router and its middleware never touch a database."""
+
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def serve(self, request, write=False):
+        seen = {}
+
+        def view(request):
+            seen["read"] = self.router.db_for_read(Post)
+            if write:
+                seen["write"] = self.router.db_for_write(Post)
+            return HttpResponse()
+
+        def handler(request):
+            # What Django's handler does between the middleware calls.
+            request.resolver_match = resolve(request.path)
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = routers.ReplicaMiddleware(handler)
+        return middleware(request), seen
+
+    def test_router_reads_feeds_from_replicas(self):
+        response, seen = self.serve(self.factory.get("/"))
+
+        self.assertEqual(seen["read"], "replica1")
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_router_keeps_other_requests_on_primary(self):
+        _, seen = self.serve(self.factory.get("/new/"))
+        self.assertIsNone(seen["read"])
+
+        _, seen = self.serve(self.factory.get("/api/v1/profiles/alice/"))
+        self.assertIsNone(seen["read"])
+
+        _, seen = self.serve(self.factory.post("/"))
+        self.assertIsNone(seen["read"])
+
+    def test_router_pins_writers_to_primary(self):
+        response, seen = self.serve(self.factory.post("/new/"), write=True)
+
+        self.assertEqual(seen["write"], "default")
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]["max-age"], 10)
+
+        request = self.factory.get("/")
+        request.COOKIES[routers.PIN_COOKIE] = "1"
+        _, seen = self.serve(request)
+        self.assertIsNone(seen["read"])
+
+    def test_router_migrates_primary_only(self):
+        self.assertTrue(self.router.allow_migrate("default", "posts"))
+        self.assertFalse(self.router.allow_migrate("replica1", "posts"))
+
+
+class SyncReplicasTest(TransactionTestCase):
+    def test_sync_replicas_copies_primary(self):
+        author = User.objects.create_user(username="Primary")
+        Post.objects.create(text="Пост", author=author)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "replica.sqlite3")
+        replica = {**connections.databases["default"], "NAME": path}
+
+        with override_settings(DATABASE_REPLICAS=["replica_test"]), \
+                mock.patch.dict(connections.databases,
+                                {"replica_test": replica}):
+            call_command("sync_replicas", stdout=StringIO())
+
+        copy = sqlite3.connect(path)
+        self.addCleanup(copy.close)
+        self.assertEqual(
+            copy.execute("SELECT text FROM posts_post").fetchall(),
+            [("Пост",)]
+        )
+
+
+@override_settings(DATABASE_REPLICAS=["replica_test"])
+class LaggingReplicaTest(TransactionTestCase):
+    """A replica synced before an edit must not feed the cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="Lagging")
+        self.post = Post.objects.create(
+            text="Старый текст", author=self.author
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        replica = {
+            **connections.databases["default"],
+            "NAME": os.path.join(directory.name, "replica.sqlite3"),
+        }
+        patch = mock.patch.dict(
+            connections.databases, {"replica_test": replica}
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.close_replica)
+        call_command("sync_replicas", stdout=StringIO())
+        self.post.text = "Новый текст"
+        self.post.save()
+
+    def close_replica(self):
+        connections["replica_test"].close()
+        del connections["replica_test"]
+
+    def test_replica_reads_stay_out_of_primary_cache_entries(self):
+        self.assertContains(self.client.get(reverse("index")), "Старый текст")
+
+        author = Client()
+        author.force_login(self.author)
+        author.cookies[routers.PIN_COOKIE] = "1"
+        response = author.get(reverse("index"))
+
+        self.assertContains(response, "Новый текст")
+        self.assertNotContains(response, "Старый текст")
+
+    def test_replica_reads_carry_no_validators(self):
+        response = self.client.get(reverse("index"))
+
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_replica_reads_expire_once_replicas_caught_up(self):
+        self.client.get(reverse("index"))
+        call_command("sync_replicas", stdout=StringIO())
+
+        response = Client().get(reverse("index"))
+
+        self.assertContains(response, "Новый текст")
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+from ..search import search_posts
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Searcher")
+        cls.post = Post.objects.create(
+            text="Прогулка по вечернему городу", author=cls.user
+        )
+        Post.objects.create(text="Рецепт яблочного пирога", author=cls.user)
+
+    def texts(self, query):
+        return list(search_posts(query).values_list("text", flat=True))
+
+    def test_search_matches_words_and_prefixes(self):
+        self.assertEqual(self.texts("вечерн город"), [self.post.text])
+        self.assertEqual(self.texts("пирог город"), [])
+        self.assertEqual(self.texts("  "), [])
+
+    def test_search_index_follows_edits_and_deletes(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = "Утренняя пробежка"
+        post.save()
+        self.assertEqual(self.texts("город"), [])
+        self.assertEqual(self.texts("пробежка"), ["Утренняя пробежка"])
+
+        post.delete()
+        self.assertEqual(self.texts("пробежка"), [])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.texts('город" *('), [self.post.text])
+
+    def test_search_view_shows_results(self):
+        response = self.client.get(reverse("search"), {"q": "пирога"})
+
+        self.assertTemplateUsed(response, "posts/search.html")
+        self.assertEqual(
+            [post.text for post in response.context["page"]],
+            ["Рецепт яблочного пирога"]
+        )
+
+    def test_search_returns_every_matching_post(self):
+        Post.objects.bulk_create(
+            Post(text=f"Заметка {i}", author=self.user) for i in range(5)
+        )
+
+        self.assertEqual(
+            sorted(self.texts("заметка")),
+            [f"Заметка {i}" for i in range(5)]
+        )
+        self.assertEqual(len(self.texts("замет 3")), 1)
@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import AuthorStats, Comment, Follow, Post, TimelineEntry
+from ..stats import exact_counts
+
+
+class SeedLoadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command(
+            "seed_load", users=30, groups=3, posts=300, comments=100,
+            follows=5, seed=1, batch_size=50, stdout=StringIO()
+        )
+
+    def test_seed_load_creates_consistent_data(self):
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        post = Post.objects.order_by("-comment_count").first()
+        self.assertEqual(post.comment_count, post.comments.count())
+        stats = AuthorStats.objects.order_by("-posts_count").first()
+        self.assertEqual(
+            exact_counts([stats.author_id])[stats.author_id]["posts_count"],
+            stats.posts_count
+        )
+
+    def test_seed_load_skews_authorship(self):
+        top = AuthorStats.objects.order_by("-posts_count")
+        self.assertGreater(top[0].posts_count, 300 / 30 * 2)
+
+    def test_benchmark_views_reports_and_compares(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "baseline.json")
+        cache.set("kept", True)
+        call_command(
+            "benchmark_views", repeat=2, save=path, stdout=StringIO()
+        )
+        self.assertTrue(cache.get("kept"))
+        with open(path) as stream:
+            baseline = json.load(stream)
+        self.assertEqual(set(baseline["current"]), {
+            "index", "group_posts", "profile", "post_view", "follow_index"
+        })
+
+        baseline["current"]["index"]["queries"] = 0
+        with open(path, "w") as stream:
+            json.dump(baseline, stream)
+        with self.assertRaisesMessage(CommandError, "current index"):
+            call_command(
+                "benchmark_views", repeat=2, compare=path, tolerance=1000,
+                stdout=StringIO()
+            )
@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+
+LOG_DIR = tempfile.mkdtemp()
+LOG = os.path.join(LOG_DIR, "slow.jsonl")
+# Only around the statements under test, fixture setup would be logged too.
+EVERY_QUERY = override_settings(SLOW_QUERY_THRESHOLD=0)
+
+
+@override_settings(SLOW_QUERY_LOG=LOG)
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Slow")
+        Post.objects.create(text="Пост", author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(LOG_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        if os.path.exists(LOG):
+            os.remove(LOG)
+
+    def entries(self):
+        with open(LOG) as log:
+            return [json.loads(line) for line in log]
+
+    def test_slow_queries_carry_view_origin_and_plan(self):
+        with EVERY_QUERY, self.assertLogs("posts.slow_queries", "WARNING"):
+            self.client.get(reverse("profile", kwargs={"username": "Slow"}))
+
+        entry = next(
+            entry for entry in self.entries()
+            if "FROM \"auth_user\"" in entry["sql"]
+        )
+        self.assertEqual(entry["view"], "profile")
+        self.assertTrue(entry["origin"].startswith("posts/"))
+        self.assertTrue(entry["plan"])
+
+    def test_slow_queries_flag_full_scans(self):
+        with EVERY_QUERY, self.assertLogs("posts.slow_queries", "WARNING"):
+            list(Post.objects.filter(text="Пост").order_by())
+            list(Post.objects.filter(pk=1))
+
+        scans = [entry["full_scans"] for entry in self.entries()]
+        self.assertEqual(scans, [["posts_post"], []])
+
+        out = StringIO()
+        call_command("slow_queries", full_scans=True, stdout=out)
+        self.assertIn("FULL SCAN: posts_post", out.getvalue())
+        self.assertEqual(out.getvalue().count(" x, "), 1)
+
+    def test_slow_queries_unwritable_log_does_not_fail_requests(self):
+        with EVERY_QUERY, override_settings(SLOW_QUERY_LOG=LOG_DIR), \
+                self.assertLogs("posts.slow_queries", "ERROR"):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
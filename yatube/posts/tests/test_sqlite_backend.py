@@ -0,0 +1,46 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import TestCase, TransactionTestCase
+
+
+class SQLiteBackendTest(TestCase):
+    def test_backend_applies_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA temp_store")
+            self.assertEqual(cursor.fetchone()[0], 2)
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -20000)
+
+    def test_backend_retries_busy_statements_outside_transactions(self):
+        execute = mock.Mock(side_effect=[
+            OperationalError("database is locked"), "done"
+        ])
+        with mock.patch.object(connection, "in_atomic_block", False), \
+                mock.patch("time.sleep"):
+            result = connection._retry_busy(
+                execute, "SELECT 1", None, False, {}
+            )
+        self.assertEqual(result, "done")
+        self.assertEqual(execute.call_count, 2)
+
+    def test_backend_does_not_retry_inside_transactions(self):
+        execute = mock.Mock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            connection._retry_busy(execute, "UPDATE x", None, False, {})
+        self.assertEqual(execute.call_count, 1)
+
+
+class SQLiteBenchmarkTest(TransactionTestCase):
+    def test_benchmark_compares_backends(self):
+        out = StringIO()
+        call_command(
+            "benchmark_sqlite", writers=2, readers=1, seconds=0.2, stdout=out
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ["stock", "tuned"])
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from yatube import routers
+
+from .. import stampede
+from ..models import Post, User
+
+
+@override_settings(STAMPEDE_LOCK_TIMEOUT=1, STAMPEDE_WAIT_INTERVAL=0.01)
+class StampedeTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value="new", seconds=0):
+        def compute():
+            self.calls += 1
+            time.sleep(seconds)
+            return value
+        return compute
+
+    def test_stampede_computes_once_per_version(self):
+        self.assertEqual(
+            stampede.fetch("key", self.compute(), 60, version=1),
+            ("new", stampede.MISS)
+        )
+        self.assertEqual(
+            stampede.fetch("key", self.compute(), 60, version=1),
+            ("new", stampede.HIT)
+        )
+        self.assertEqual(
+            stampede.fetch("key", self.compute("newer"), 60, version=2),
+            ("newer", stampede.MISS)
+        )
+        self.assertEqual(self.calls, 2)
+
+    def test_stampede_serves_stale_while_locked(self):
+        stampede.fetch("key", self.compute("old"), 60, version=1)
+        cache.add("key-lock", True)
+        self.assertEqual(
+            stampede.fetch("key", self.compute(), 60, version=2),
+            ("old", stampede.STALE)
+        )
+        # Callers that need fresh data wait out the lock instead.
+        self.assertEqual(
+            stampede.fetch(
+                "key", self.compute(), 60, version=2, serve_stale=False
+            ),
+            ("new", stampede.MISS)
+        )
+
+    def test_stampede_concurrent_misses_compute_once(self):
+        results = []
+
+        def worker():
+            results.append(stampede.fetch(
+                "key", self.compute(seconds=0.2), 60, version=1
+            )[0])
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["new"] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_stampede_expensive_values_refresh_early(self):
+        stampede.fetch("key", self.compute("old"), 60, version=1)
+        entry = cache.get("key")
+        entry["delta"] = 1000
+        cache.set("key", entry)
+        # 1000 s of compute against 60 s left: every draw above
+        # 1 - exp(-0.06), all but about one in 17, refreshes it.
+        with mock.patch("posts.stampede.random.random", return_value=0.5):
+            self.assertEqual(
+                stampede.fetch("key", self.compute(), 60, version=1),
+                ("new", stampede.MISS)
+            )
+
+
+@override_settings(STAMPEDE_LOCK_TIMEOUT=0.1)
+class StaleFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="stale")
+        Post.objects.create(text="Первый", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_pinned_readers_never_see_stale_pages(self):
+        self.client.get(reverse("index"))
+        Post.objects.create(text="Второй", author=self.author)
+        # Another worker is rebuilding the page.
+        cache.add("feed-index-page-1-lock", True)
+        stale = self.client.get(reverse("index"))
+        self.client.cookies[routers.PIN_COOKIE] = "1"
+        fresh = self.client.get(reverse("index"))
+        self.assertEqual(len(stale.context["page"]), 1)
+        self.assertEqual(len(fresh.context["page"]), 2)
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import stats
+from ..models import AuthorStats, Follow, Post, User
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Counted")
+        cls.reader = User.objects.create_user(username="Counting")
+        Post.objects.create(text="Первый пост", author=cls.author)
+
+    def test_stats_computed_on_first_read(self):
+        author_stats = stats.for_author(self.author.pk)
+
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 0)
+
+    def test_stats_follow_post_changes_move_counters(self):
+        stats.for_author(self.author.pk)
+        stats.for_author(self.reader.pk)
+
+        post = Post.objects.create(text="Второй пост", author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        post.delete()
+
+        self.assertEqual(
+            AuthorStats.objects.values_list(
+                "posts_count", "followers_count", "following_count"
+            ).get(pk=self.author.pk),
+            (1, 1, 0)
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(pk=self.reader.pk).following_count, 1
+        )
+
+        Follow.objects.filter(user=self.reader).delete()
+
+        self.assertEqual(
+            AuthorStats.objects.get(pk=self.author.pk).followers_count, 0
+        )
+
+    def test_stats_profile_reads_counters(self):
+        AuthorStats.objects.filter(pk=self.author.pk).update(posts_count=7)
+
+        response = self.client.get(
+            reverse("profile", kwargs={"username": "Counted"})
+        )
+
+        self.assertEqual(response.context["posts_count"], 7)
+
+    def test_stats_reconcile_command_repairs_drift(self):
+        AuthorStats.objects.filter(pk=self.author.pk).update(
+            posts_count=42, followers_count=3
+        )
+        out = StringIO()
+
+        call_command("reconcile_author_stats", batch_size=1, stdout=out)
+
+        self.assertEqual(
+            AuthorStats.objects.values_list(
+                "posts_count", "followers_count"
+            ).get(pk=self.author.pk),
+            (1, 0)
+        )
+        self.assertTrue(AuthorStats.objects.filter(pk=self.reader.pk).exists())
+        self.assertIn("repaired 2", out.getvalue())
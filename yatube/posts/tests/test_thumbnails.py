@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from sorl.thumbnail import default
+
+from .. import thumbnails
+from ..models import Post, User
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        # sorl keeps its own storage instance, created with the real
+        # MEDIA_ROOT before the override above applies.
+        storage = mock.patch.object(
+            default, "storage", FileSystemStorage(location=TEMP_MEDIA_ROOT)
+        )
+        storage.start()
+        self.addCleanup(storage.stop)
+        self.post = Post.objects.create(
+            text="Пост с картинкой",
+            author=User.objects.create_user(username="Photographer"),
+            image=SimpleUploadedFile(
+                name="small.gif", content=SMALL_GIF, content_type="image/gif"
+            ),
+        )
+
+    def test_thumbnails_card_renders_placeholder_until_ready(self):
+        self.assertIsNone(thumbnails.ready_thumbnail(self.post.image, "card"))
+        response = self.client.get(reverse("index"))
+        self.assertNotContains(response, "<img")
+
+        thumbnails.generate(self.post.pk)
+
+        thumbnail = thumbnails.ready_thumbnail(self.post.image, "card")
+        self.assertIsNotNone(thumbnail)
+        response = self.client.get(reverse("index"))
+        self.assertContains(response, thumbnail.url)
+
+    def test_thumbnails_broken_image_does_not_break_page(self):
+        Post.objects.filter(pk=self.post.pk).update(image="/etc/passwd")
+        post = Post.objects.get(pk=self.post.pk)
+
+        with self.assertLogs("posts.thumbnails", "ERROR") as logs:
+            self.assertIsNone(thumbnails.ready_thumbnail(post.image, "card"))
+        self.assertIn("Thumbnail lookup failed", logs.output[0])
+
+    @override_settings(THUMBNAIL_SYNC=True)
+    def test_thumbnails_sync_mode_generates_in_calling_thread(self):
+        with mock.patch.object(thumbnails, "_get_executor") as executor:
+            thumbnails._submit(self.post.pk)
+
+        executor.assert_not_called()
+        self.assertIsNotNone(
+            thumbnails.ready_thumbnail(self.post.image, "card")
+        )
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="Reader")
+        cls.author = User.objects.create_user(username="Writer")
+        cls.old_post = Post.objects.create(
+            text="Старый пост", author=cls.author
+        )
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        cache.clear()
+
+    def feed_texts(self):
+        response = self.reader_client.get(reverse("follow_index"))
+        return [post.text for post in response.context["page"]]
+
+    def test_timeline_follow_backfills_existing_posts(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.old_post).exists())
+        self.assertEqual(self.feed_texts(), ["Старый пост"])
+
+    def test_timeline_new_post_fans_out_to_followers(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text="Новый пост", author=self.author)
+
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
+        self.assertEqual(self.feed_texts(), ["Новый пост", "Старый пост"])
+
+    def test_timeline_unfollow_retracts_posts(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(self.feed_texts(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_timeline_celebrity_posts_are_merged_on_read(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text="Пост знаменитости", author=self.author)
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(
+            self.feed_texts(), ["Пост знаменитости", "Старый пост"]
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_timeline_celebrity_crossing_limit_upwards_shows_new_posts(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.feed_texts()
+        other = User.objects.create_user(username="Other")
+        Follow.objects.create(user=other, author=self.author)
+        Post.objects.create(text="Пост знаменитости", author=self.author)
+
+        self.assertEqual(
+            self.feed_texts(), ["Пост знаменитости", "Старый пост"]
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_timeline_former_celebrity_posts_are_backfilled(self):
+        other = User.objects.create_user(username="Other")
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        Post.objects.create(text="Пост знаменитости", author=self.author)
+        self.feed_texts()
+        Follow.objects.filter(user=other).delete()
+
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post__text="Пост знаменитости").exists())
+        self.assertEqual(
+            self.feed_texts(), ["Пост знаменитости", "Старый пост"]
+        )
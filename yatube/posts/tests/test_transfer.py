@@ -0,0 +1,67 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+class TransferCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Exported")
+        cls.reader = User.objects.create_user(username="Importer")
+        cls.group = Group.objects.create(
+            title="Группа", slug="moved", description="Описание"
+        )
+        cls.post = Post.objects.create(
+            text="Перенесённый пост", author=cls.author, group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.reader, text="Ок")
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "dump.jsonl.gz")
+
+    def transfer(self):
+        out = StringIO()
+        call_command("export_posts", self.path, chunk_size=1, stdout=out)
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        User.objects.filter(username="Importer").delete()
+        call_command("import_posts", self.path, batch_size=1, stdout=out)
+        return out.getvalue()
+
+    def test_transfer_round_trip_remaps_foreign_keys(self):
+        output = self.transfer()
+
+        post = Post.objects.get()
+        comment = Comment.objects.get()
+        reader = User.objects.get(username="Importer")
+        self.assertEqual(post.text, "Перенесённый пост")
+        self.assertEqual(post.pub_date, self.post.pub_date)
+        self.assertEqual(post.author_id, self.author.id)
+        self.assertEqual(post.group_id, self.group.id)
+        self.assertEqual(post.comment_count, 1)
+        self.assertEqual((comment.post_id, comment.author_id),
+                         (post.pk, reader.pk))
+        self.assertTrue(Follow.objects.filter(
+            user=reader, author=self.author).exists())
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertIn("Imported 2 users, 1 groups, 1 posts", output)
+
+    def test_transfer_refreshes_timelines_and_counters(self):
+        self.transfer()
+
+        reader = User.objects.get(username="Importer")
+        stats = AuthorStats.objects.get(pk=self.author.pk)
+        self.assertEqual(
+            list(reader.timeline.values_list("post__text", flat=True)),
+            ["Перенесённый пост"]
+        )
+        self.assertEqual((stats.posts_count, stats.followers_count), (1, 1))
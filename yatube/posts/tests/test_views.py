@@ -3,10 +3,13 @@ from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Follow, Group, Post
+from .. import feed_cache
+from ..models import Comment, Follow, Group, Post
 
 User = get_user_model()
 
@@ -132,15 +135,33 @@ class PostPagesTest(TestCase):
             author=self.user).exists())
 
     def test_cache(self):
+        self.authorized_client.get(reverse("index"))
+        Post.objects.bulk_create(
+            [Post(text="Кэш тест текст", author=self.user)]
+        )
+        response = self.authorized_client.get(reverse("index"))
+        self.assertNotContains(response, "Кэш тест текст")
+        cache.clear()
+        response = self.authorized_client.get(reverse("index"))
+        self.assertContains(response, "Кэш тест текст")
+
+    def test_cache_invalidated_on_write(self):
+        self.authorized_client.get(reverse("index"))
         post = Post.objects.create(text="Кэш тест текст", author=self.user)
         response = self.authorized_client.get(reverse("index"))
-        content = response.content
+        self.assertContains(response, "Кэш тест текст")
         post.delete()
         response = self.authorized_client.get(reverse("index"))
-        self.assertEqual(content, response.content)
-        cache.clear()
-        response = self.authorized_client.get(reverse("index"))
-        self.assertNotEqual(content, response.content)
+        self.assertNotContains(response, "Кэш тест текст")
+
+    def test_cache_invalidates_previous_group_on_edit(self):
+        group_url = reverse("group_posts", kwargs={"slug": "test-slug"})
+        self.authorized_client.get(group_url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = None
+        post.save()
+        response = self.authorized_client.get(group_url)
+        self.assertNotContains(response, "Тестовый текст")
 
 
 class PaginatorViewsTest(TestCase):
@@ -153,6 +174,9 @@ class PaginatorViewsTest(TestCase):
             author=cls.user) for i in range(13))
         Post.objects.bulk_create(objs)
 
+    def setUp(self):
+        cache.clear()
+
     def test_views_first_page(self):
         response = self.client.get(reverse("index"))
         self.assertEqual(len(response.context.get("page").object_list), 10)
@@ -165,3 +189,172 @@ class PaginatorViewsTest(TestCase):
         response = self.client.get(reverse("index"))
         page_context = response.context.get("page").object_list[0].text
         self.assertEqual(page_context, "Тестовый текст")
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Counter")
+        cls.group = Group.objects.create(title="Группа", slug="counted")
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f"Пост {i}", author=self.user, group=self.group
+            )
+            Comment.objects.create(post=post, author=self.user, text="к")
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        return len(queries)
+
+    def test_views_feed_queries_do_not_grow_with_page_size(self):
+        Follow.objects.create(
+            user=User.objects.create_user(username="Reader"),
+            author=self.user
+        )
+        urls = (
+            reverse("index"),
+            reverse("group_posts", kwargs={"slug": "counted"}),
+            reverse("profile", kwargs={"username": "Counter"}),
+        )
+        self.add_posts(1)
+        before = [self.count_queries(url) for url in urls]
+        self.add_posts(9)
+        after = [self.count_queries(url) for url in urls]
+
+        self.assertEqual(before, after)
+
+    def test_views_feed_shows_comment_count(self):
+        self.add_posts(1)
+        response = self.authorized_client.get(reverse("index"))
+
+        self.assertEqual(response.context["page"][0].comment_count, 1)
+        self.assertContains(response, "Комментариев: 1")
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="CardAuthor")
+        cls.reader = User.objects.create_user(username="CardReader")
+        cls.post = Post.objects.create(text="Текст карточки", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_views_card_shared_between_viewers(self):
+        edit_url = reverse("post_edit", kwargs={
+            "username": "CardAuthor", "post_id": self.post.id
+        })
+        self.reader_client.get(reverse("index"))
+        Post.objects.filter(pk=self.post.pk).update(text="В обход сигналов")
+
+        author_response = self.author_client.get(reverse("index"))
+        reader_response = self.reader_client.get(reverse("index"))
+
+        self.assertContains(author_response, "Текст карточки")
+        self.assertContains(author_response, edit_url)
+        self.assertNotContains(reader_response, edit_url)
+
+    def test_views_card_refreshed_by_comment_and_rename(self):
+        self.reader_client.get(reverse("index"))
+        Comment.objects.create(post=self.post, author=self.reader, text="к")
+        self.assertContains(
+            self.reader_client.get(reverse("index")), "Комментариев: 1"
+        )
+
+        author = User.objects.get(pk=self.user.pk)
+        author.username = "RenamedAuthor"
+        author.save()
+        self.assertContains(
+            self.reader_client.get(reverse("index")), "@RenamedAuthor"
+        )
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Validated")
+        cls.post = Post.objects.create(text="Пост", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, response):
+        return self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+
+    def test_views_unchanged_pages_return_not_modified(self):
+        urls = (
+            reverse("index"),
+            reverse("profile", kwargs={"username": "Validated"}),
+            reverse("post", kwargs={
+                "username": "Validated", "post_id": self.post.id
+            }),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                # Anonymous pages come from the page cache.
+                with self.assertNumQueries(0):
+                    revalidated = self.revalidate(url, response)
+                self.assertEqual(
+                    revalidated.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_views_changes_invalidate_validators(self):
+        index = self.client.get(reverse("index"))
+        post_url = reverse("post", kwargs={
+            "username": "Validated", "post_id": self.post.id
+        })
+        post_page = self.client.get(post_url)
+
+        Comment.objects.create(post=self.post, author=self.user, text="к")
+
+        self.assertEqual(
+            self.revalidate(reverse("index"), index).status_code,
+            HTTPStatus.OK
+        )
+        self.assertEqual(
+            self.revalidate(post_url, post_page).status_code, HTTPStatus.OK
+        )
+
+    def test_views_etag_depends_on_viewer(self):
+        anonymous = self.client.get(reverse("index"))
+        self.client.force_login(self.user)
+
+        response = self.revalidate(reverse("index"), anonymous)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class FeedVersionCommitTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="Committer")
+
+    def test_views_pages_cached_before_commit_turn_stale(self):
+        with transaction.atomic():
+            Post.objects.create(text="Незакоммиченный", author=self.user)
+            # What a reader on another connection caches meanwhile.
+            before_commit = feed_cache.get_version("index")
+
+        self.assertNotEqual(feed_cache.get_version("index"), before_commit)
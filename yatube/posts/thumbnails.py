@@ -0,0 +1,119 @@
+"""Eager thumbnail generation in a local worker pool.
+
+Thumbnails for every preset in ``THUMBNAIL_PRESETS`` are generated after a
+post with an image is committed, so no request has to decode and resize
+the original. Until a thumbnail exists the card renders a placeholder.
+``THUMBNAIL_SYNC`` generates them in the committing thread instead, which
+tests use so no work outlives them.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import feed_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix="thumbnails",
+            )
+    return _executor
+
+
+def _options(source, options):
+    # Mirrors ThumbnailBackend.get_thumbnail so names match what it stores.
+    options = dict(options)
+    backend = default.backend
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault("format", backend._get_format(source))
+    for key, value in ThumbnailBackend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in ThumbnailBackend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def ready_thumbnail(image, preset):
+    """Return the stored thumbnail of ``image`` or ``None`` if not ready.
+
+    Never generates anything in the calling thread; a missing thumbnail of
+    an existing image is queued for generation instead.
+    """
+    if not image:
+        return None
+    geometry, options = settings.THUMBNAIL_PRESETS[preset]
+    try:
+        source = ImageFile(image)
+        name = default.backend._get_thumbnail_filename(
+            source, geometry, _options(source, options)
+        )
+        thumbnail = default.kvstore.get(ImageFile(name, default.storage))
+        if thumbnail is None and image.storage.exists(image.name):
+            enqueue(image.instance.pk)
+    except Exception:
+        # Like sorl's {% thumbnail %} tag: a broken image must not break
+        # the page it is shown on.
+        logger.exception("Thumbnail lookup failed for %s", image.name)
+        return None
+    return thumbnail
+
+
+def generate(post_id):
+    """Create every preset thumbnail of a post and refresh its card."""
+    post = Post.objects.only("id", "image").get(pk=post_id)
+    if post.image:
+        for geometry, options in settings.THUMBNAIL_PRESETS.values():
+            get_thumbnail(post.image, geometry, **options)
+        feed_cache.bump_cards(f"post-{post_id}")
+
+
+def _generate_logged(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception("Thumbnail generation failed for post %s", post_id)
+
+
+def _work(post_id):
+    try:
+        _generate_logged(post_id)
+    finally:
+        _pending.discard(post_id)
+        connection.close()
+
+
+def _submit(post_id):
+    if settings.THUMBNAIL_SYNC:
+        _generate_logged(post_id)
+        return
+    if post_id in _pending:
+        return
+    _pending.add(post_id)
+    _get_executor().submit(_work, post_id)
+
+
+def enqueue(post_id):
+    """Generate the thumbnails of a post once the transaction commits."""
+    if post_id is not None:
+        transaction.on_commit(lambda: _submit(post_id))
@@ -0,0 +1,159 @@
+"""Materialized per-user follow timelines.
+
+Every post of a followed author is copied into ``TimelineEntry`` rows of
+the author's followers when it is written, so the follow feed becomes one
+range scan over the ``(user, pub_date, post)`` index. Authors with more
+than ``TIMELINE_FANOUT_LIMIT`` followers are not fanned out, their posts
+are merged into the feed at read time.
+
+An author crossing the limit changes where their posts come from for every
+follower: ``followers_changed`` invalidates the cached celebrity sets and,
+when the author drops back under the limit, backfills the posts written
+meanwhile into their followers' timelines.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from . import feed_cache, stats
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+
+def _celebrities_key(user_id):
+    generation = feed_cache.get_version("celebrities")
+    return f"timeline-celebrities-{generation}-{user_id}"
+
+
+def is_celebrity(author_id):
+    followers = stats.for_author(author_id).followers_count
+    return followers > settings.TIMELINE_FANOUT_LIMIT
+
+
+def followed_celebrities(user_id):
+    key = _celebrities_key(user_id)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = list(
+            AuthorStats.objects.filter(
+                author__following__user_id=user_id,
+                followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values_list("author_id", flat=True)
+        )
+        cache.set(
+            key, author_ids,
+            timeout=settings.TIMELINE_CELEBRITY_CACHE_TIMEOUT
+        )
+    return author_ids
+
+
+def _bulk_insert(entries):
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """Copy a new post into the timelines of its author's followers."""
+    if is_celebrity(post.author_id):
+        return
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    followers = (
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for user_id in followers:
+        batch.append(TimelineEntry(
+            user_id=user_id, post_id=post.id, pub_date=post.pub_date
+        ))
+        if len(batch) >= batch_size:
+            _bulk_insert(batch)
+            batch = []
+    if batch:
+        _bulk_insert(batch)
+
+
+def _latest_posts(author_id):
+    return list(
+        Post.objects.filter(author_id=author_id)
+        .order_by("-pub_date", "-id")
+        .values_list("id", "pub_date")[:settings.TIMELINE_BACKFILL_LIMIT]
+    )
+
+
+def backfill(user_id, author_id):
+    """Copy the latest posts of a newly followed author into a timeline."""
+    cache.delete(_celebrities_key(user_id))
+    if is_celebrity(author_id):
+        return
+    _bulk_insert([
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in _latest_posts(author_id)
+    ])
+
+
+def followers_changed(author_id, delta):
+    """React to an author gaining (``delta`` 1) or losing (-1) a follower.
+
+    Call it after the counters moved and before ``backfill`` or
+    ``retract`` of the follower.
+    """
+    followers = (
+        AuthorStats.objects.filter(pk=author_id)
+        .values_list("followers_count", flat=True).first()
+    )
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    # Without counters no fan-out decision was ever made for the author.
+    if followers is None or (followers > limit) == (followers - delta > limit):
+        return
+    feed_cache.bump("celebrities")
+    if followers > limit:
+        return
+    # Posts written while the author was a celebrity have no entries.
+    posts = _latest_posts(author_id)
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    followers = (
+        Follow.objects.filter(author_id=author_id)
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for user_id in followers:
+        batch.extend(
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        )
+        if len(batch) >= batch_size:
+            _bulk_insert(batch)
+            batch = []
+    if batch:
+        _bulk_insert(batch)
+
+
+def retract(user_id, author_id):
+    """Remove the posts of an unfollowed author from a timeline."""
+    cache.delete(_celebrities_key(user_id))
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def feed_for(user):
+    """Return the follow feed of ``user`` newest first."""
+    celebrities = followed_celebrities(user.id)
+    if not celebrities:
+        # Both keys come from the entry to walk timeline_user_date_idx
+        # without a sort. They are annotations so the paginator's cursor
+        # filter reuses this join: filtering on "timeline_entries__..."
+        # again would join every follower's entry of the post.
+        return (
+            Post.objects.filter(timeline_entries__user=user)
+            .annotate(
+                entry_pub_date=F("timeline_entries__pub_date"),
+                entry_post_id=F("timeline_entries__post_id"),
+            )
+            .order_by("-entry_pub_date", "-entry_post_id")
+        )
+    entries = TimelineEntry.objects.filter(user=user).values("post_id")
+    return Post.objects.filter(
+        Q(pk__in=entries) | Q(author_id__in=celebrities)
+    ).order_by("-pub_date", "-id")
@@ -0,0 +1,122 @@
+"""Streaming JSONL export and import of posts and everything around them.
+
+One JSON object per line, grouped by model in dependency order: users,
+groups, posts, comments, follows. Users and groups are referenced by
+username and slug, posts and comments keep their source ``pk`` so the
+importer can remap them. See the ``export_posts`` and ``import_posts``
+commands; ``seed_load`` shares the bulk loading helpers.
+"""
+import gzip
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from . import feed_cache, timeline
+from .models import Follow
+
+MODELS = ("user", "group", "post", "comment", "follow")
+
+
+def open_stream(path, mode, compress=None):
+    """Open ``path`` as text, gzipped if asked or if it ends with ``.gz``."""
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder drops microseconds, which order the feeds.
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump(record):
+    return json.dumps(record, cls=Encoder, ensure_ascii=False)
+
+
+@contextmanager
+def keep_dates(*fields):
+    """Let ``bulk_create`` store given dates of ``auto_now_add`` fields."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(*models):
+    """Move id sequences past rows inserted with explicit ids."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def refresh_derived(authors, groups, batch_size, stdout):
+    """Redo what model signals would have done for bulk loaded rows.
+
+    ``authors`` are the ids of users whose posts or follows were loaded,
+    ``groups`` the ids of groups that got posts.
+    """
+    authors = sorted(authors)
+    for start in range(0, len(authors), batch_size):
+        follows = (
+            Follow.objects.filter(
+                author_id__in=authors[start:start + batch_size]
+            )
+            .values_list("user_id", "author_id")
+            .iterator(chunk_size=batch_size)
+        )
+        for user_id, author_id in follows:
+            timeline.backfill(user_id, author_id)
+    call_command("reconcile_author_stats", stdout=stdout)
+    scopes = [f"profile-{pk}" for pk in authors]
+    scopes += [f"stats-{pk}" for pk in authors]
+    scopes += [f"group-{pk}" for pk in groups if pk is not None]
+    feed_cache.bump("index", "groups", *scopes)
+    feed_cache.bump_cards()
+
+
+class Progress:
+    """Count rows per model and report the rate every ``every`` rows."""
+
+    def __init__(self, stdout, every):
+        self.stdout = stdout
+        self.every = every
+        self.counts = dict.fromkeys(MODELS, 0)
+        self.started = time.monotonic()
+
+    def rate(self, rows):
+        return rows / max(time.monotonic() - self.started, 1e-6)
+
+    def add(self, model, rows=1):
+        before = self.counts[model]
+        self.counts[model] += rows
+        if before // self.every != self.counts[model] // self.every:
+            total = sum(self.counts.values())
+            self.stdout.write(
+                f"{model}: {self.counts[model]} rows, "
+                f"{self.rate(total):.0f} rows/s overall"
+            )
+
+    def summary(self):
+        total = sum(self.counts.values())
+        counts = ", ".join(
+            f"{count} {model}s" for model, count in self.counts.items()
+        )
+        return (
+            f"{counts} in {time.monotonic() - self.started:.1f}s "
+            f"({self.rate(total):.0f} rows/s)."
+        )
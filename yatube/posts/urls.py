@@ -12,6 +12,8 @@ urlpatterns = [
     path("new/", views.new_post, name="new_post"),
     path("group/<slug:slug>/", views.group_posts, name="group_posts"),
     path("follow/", views.follow_index, name="follow_index"),
+    path("search/", views.search, name="search"),
+    path("metrics", views.metrics_view, name="metrics"),
     path("<str:username>/", views.profile, name="profile"),
     path("<str:username>/<int:post_id>/", views.post_view, name="post"),
     path("<username>/<post_id>/edit/", views.edit_post, name="post_edit"),
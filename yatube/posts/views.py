@@ -1,11 +1,17 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_GET, require_http_methods
 
+from yatube import routers
+
+from . import conditional, feed_cache, lookups, metrics, stats, timeline
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Follow, Post, User
+from .paginator import CursorPaginator
+from .search import search_posts
 
 
 @login_required
@@ -15,7 +21,8 @@ def new_post(request):
     if form.is_valid():
         new_post = form.save(commit=False)
         new_post.author_id = request.user.id
-        new_post.save()
+        with transaction.atomic():
+            new_post.save()
         return redirect("index")
     return render(request, "posts/new_post.html", {
         "form": form, "is_edit": False
@@ -48,53 +55,51 @@ def edit_post(request, username, post_id):
 
 
 @require_GET
+@conditional.validated(conditional.index_scopes)
 def index(request):
-    page_number = request.GET.get('page')
-    key = f"index-cache-page-{page_number}"
-    page = cache.get(key)
-    if page is None:
-        posts = Post.objects.all()
-        paginator = Paginator(posts, 10)
-        page = paginator.get_page(page_number)
-        cache.set(key, page, timeout=20)
-
+    page = feed_cache.feed_page(
+        request.GET, "index", Post.objects.for_feed(),
+        serve_stale=not routers.is_pinned(request)
+    )
     context = {'page': page}
     return render(request, 'posts/index.html', context)
 
 
 @require_GET
+@conditional.validated(conditional.group_scopes)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    group = lookups.group_or_404(slug)
+    posts = group.posts.for_feed()
+    page = feed_cache.feed_page(
+        request.GET, f"group-{group.pk}", posts,
+        serve_stale=not routers.is_pinned(request)
+    )
     return render(request, "posts/group.html", {
         "page": page, "group": group, "posts": posts,
     })
 
 
 @require_GET
+@conditional.validated(conditional.profile_scopes)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = user.post_set.all()
-    posts_count = posts.count()
-    followers_count = Follow.objects.filter(author=user).count()
-    follow_count = Follow.objects.filter(user=user).count()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    user = lookups.user_or_404(username)
+    posts = user.post_set.for_feed()
+    author_stats = stats.for_author(user.pk)
+    page = feed_cache.feed_page(
+        request.GET, f"profile-{user.pk}", posts,
+        serve_stale=not routers.is_pinned(request)
+    )
     following = False
     if request.user.is_authenticated:
         following = Follow.objects.filter(
             user=request.user, author=user).exists()
     context = {
         "author": user,
-        "posts_count": posts_count,
+        "posts_count": author_stats.posts_count,
         "page": page,
         "following": following,
-        "followers_count": followers_count,
-        "follow_count": follow_count,
+        "followers_count": author_stats.followers_count,
+        "follow_count": author_stats.following_count,
     }
 
     return render(
@@ -105,15 +110,16 @@ def profile(request, username):
 
 
 @require_http_methods(["GET", "POST"])
+@conditional.validated(conditional.post_scopes)
 def post_view(request, username, post_id):
     post = get_object_or_404(
-        Post,
+        Post.objects.for_feed(),
         author__username=username,
         pk=post_id
     )
     form = CommentForm(request.POST or None)
-    object_for_post = get_object_or_404(User, username=username)
-    posts_count = object_for_post.post_set.all().count()
+    object_for_post = post.author
+    author_stats = stats.for_author(post.author_id)
     comments = post.comments.all()
     following = False
     if request.user.is_authenticated:
@@ -121,18 +127,16 @@ def post_view(request, username, post_id):
             author=post.author, user=request.user
         ).exists():
             following = True
-    followers_count = Follow.objects.filter(author=post.author).count()
-    follow_count = Follow.objects.filter(user=post.author).count()
     context = {
         "post": post,
         "form": form,
         "author": post.author,
         "comments": comments,
         "object_for_post": object_for_post,
-        "posts_count": posts_count,
+        "posts_count": author_stats.posts_count,
         "following": following,
-        "followers_count": followers_count,
-        "follow_count": follow_count,
+        "followers_count": author_stats.followers_count,
+        "follow_count": author_stats.following_count,
     }
 
     return render(
@@ -145,7 +149,7 @@ def post_view(request, username, post_id):
 @require_http_methods(["GET", "POST"])
 @login_required
 def add_comment(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.for_feed(), id=post_id)
 
     form = CommentForm(request.POST or None)
 
@@ -153,18 +157,27 @@ def add_comment(request, username, post_id):
         comment = form.save(commit=False)
         comment.post = post
         comment.author = request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return redirect("post", username, post_id)
 
     return render(request, "posts/post.html", {'form': form, "post": post})
 
 
+@require_GET
+def search(request):
+    query = request.GET.get("q", "").strip()
+    posts = search_posts(query, Post.objects.for_feed())
+    page = CursorPaginator(posts, 10).page_from(request.GET)
+    return render(request, "posts/search.html", {
+        "page": page, "query": query,
+    })
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    posts = timeline.feed_for(request.user).for_feed()
+    page = CursorPaginator(posts, 10).page_from(request.GET)
     return render(request, "posts/follow.html", {
         "page": page,
         "post": posts,
@@ -173,21 +186,30 @@ def follow_index(request):
 
 @login_required
 def profile_follow(request, username):
-    follow_author = get_object_or_404(User, username=username)
+    follow_author = lookups.user_or_404(username)
     user = get_object_or_404(User, username=request.user)
     if not Follow.objects.filter(
         author=follow_author, user=request.user
     ).exists() and user != follow_author:
-        Follow.objects.get_or_create(
-            user_id=request.user.id, author_id=follow_author.id
-        )
+        with transaction.atomic():
+            Follow.objects.get_or_create(
+                user_id=request.user.id, author_id=follow_author.id
+            )
     return redirect("profile", username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    follow_author = get_object_or_404(User, username=username)
-    Follow.objects.filter(
-        user_id=request.user.id,
-        author_id=follow_author.id).delete()
+    follow_author = lookups.user_or_404(username)
+    with transaction.atomic():
+        Follow.objects.filter(
+            user_id=request.user.id,
+            author_id=follow_author.id).delete()
     return redirect("profile", username)
+
+
+@staff_member_required
+def metrics_view(request):
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4"
+    )
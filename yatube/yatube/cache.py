@@ -0,0 +1,343 @@
+"""Two-tier cache: a bounded in-process LRU over a shared SQLite store.
+
+Every worker process keeps recently used entries in memory, so hot keys
+(feed versions, rendered cards, groups and authors looked up from URLs)
+cost a dictionary lookup. Misses fall through to ``SQLiteStore``, a file
+all processes of the host share, so a page cached by one worker is warm
+for the others.
+
+Writes go to both tiers and append the key to an invalidation log in the
+shared file. Processes read the log at most every
+``INVALIDATION_POLL_INTERVAL`` seconds and drop those keys from memory,
+which bounds how long a process can serve an entry another one replaced.
+"""
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL
+);
+CREATE TABLE IF NOT EXISTS cache_invalidation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, at REAL NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """The shared tier, one SQLite connection per thread and process.
+
+    Data methods take the names redis-py uses, so a Redis-backed store
+    with a pub/sub or stream channel can take its place. ``expires`` is an
+    absolute ``time.time()`` or ``None`` for entries that never expire.
+    """
+
+    def __init__(self, path, max_entries, cull_frequency, log_ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.cull_frequency = cull_frequency
+        self.log_ttl = log_ttl
+        self._local = threading.local()
+
+    def _db(self):
+        # Connections must not cross a fork into worker processes.
+        if getattr(self._local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode = wal")
+            db.execute("PRAGMA synchronous = normal")
+            db.executescript(SCHEMA)
+            self._local.db, self._local.pid = db, os.getpid()
+        return self._local.db
+
+    def _publish(self, db, keys):
+        ids = []
+        for key in keys:
+            cursor = db.execute(
+                "INSERT INTO cache_invalidation (key, at) VALUES (?, ?)",
+                (key, time.time())
+            )
+            ids.append(cursor.lastrowid)
+        return ids
+
+    def _write(self, operation, keys):
+        """Run ``operation(db)`` and publish ``keys`` in one transaction."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = operation(db)
+            ids = self._publish(db, keys)
+            if random.random() < 0.01:
+                self._cull(db)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return result, ids
+
+    def _cull(self, db):
+        now = time.time()
+        db.execute("DELETE FROM cache_entry WHERE expires <= ?", (now,))
+        db.execute(
+            "DELETE FROM cache_invalidation WHERE at < ?",
+            (now - self.log_ttl,)
+        )
+        count = db.execute("SELECT COUNT(*) FROM cache_entry").fetchone()[0]
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM cache_entry WHERE rowid IN (SELECT rowid FROM "
+                "cache_entry ORDER BY rowid LIMIT ?)",
+                (count // self.cull_frequency,)
+            )
+
+    def mget(self, keys):
+        """Return ``{key: (value, expires)}`` of the live ``keys``."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = self._db().execute(
+            "SELECT key, value, expires FROM cache_entry WHERE key IN ({}) "
+            "AND (expires IS NULL OR expires > ?)".format(
+                ", ".join("?" * len(keys))
+            ),
+            (*keys, time.time())
+        )
+        return {key: (value, expires) for key, value, expires in rows}
+
+    def set(self, key, value, expires, nx=False):
+        """Store ``key``; with ``nx`` only if it is missing or expired."""
+        sql = (
+            "INSERT INTO cache_entry (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = excluded.value, expires = excluded.expires"
+        )
+        params = (key, value, expires)
+        if nx:
+            sql += " WHERE cache_entry.expires <= ?"
+            params += (time.time(),)
+        stored, ids = self._write(
+            lambda db: db.execute(sql, params).rowcount > 0, [key]
+        )
+        return stored, ids
+
+    def mset(self, mapping):
+        """Store ``{key: (value, expires)}``."""
+        def operation(db):
+            db.executemany(
+                "INSERT INTO cache_entry (key, value, expires) "
+                "VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, expires = excluded.expires",
+                [(key, value, expires)
+                 for key, (value, expires) in mapping.items()]
+            )
+        return self._write(operation, list(mapping))[1]
+
+    def expire(self, key, expires):
+        return self._write(lambda db: db.execute(
+            "UPDATE cache_entry SET expires = ? WHERE key = ? "
+            "AND (expires IS NULL OR expires > ?)",
+            (expires, key, time.time())
+        ).rowcount > 0, [key])
+
+    def delete(self, *keys):
+        def operation(db):
+            return sum(db.execute(
+                "DELETE FROM cache_entry WHERE key = ?", (key,)
+            ).rowcount for key in keys)
+        return self._write(operation, keys)
+
+    def flushdb(self):
+        """Drop everything; ``None`` in the log tells readers to clear."""
+        return self._write(
+            lambda db: db.execute("DELETE FROM cache_entry"), [None]
+        )[1]
+
+    def messages(self, after):
+        """Return the ``(id, key)`` log entries newer than ``after`` and
+        whether older unseen entries were already trimmed."""
+        db = self._db()
+        rows = db.execute(
+            "SELECT id, key FROM cache_invalidation WHERE id > ? "
+            "ORDER BY id", (after,)
+        ).fetchall()
+        oldest = db.execute(
+            "SELECT MIN(id) FROM cache_invalidation"
+        ).fetchone()[0]
+        return rows, oldest is not None and oldest > after + 1
+
+    def last_message(self):
+        return self._db().execute(
+            "SELECT COALESCE(MAX(id), 0) FROM cache_invalidation"
+        ).fetchone()[0]
+
+
+class TwoTierCache(BaseCache):
+    """Cache backend, ``LOCATION`` is the path of the shared SQLite file.
+
+    OPTIONS: ``LOCAL_MAX_ENTRIES`` bounds the in-process LRU,
+    ``LOCAL_TIMEOUT`` caps how long an entry stays in it,
+    ``INVALIDATION_POLL_INTERVAL`` is how often the invalidation log is
+    read and ``INVALIDATION_LOG_TTL`` how long it is kept. ``MAX_ENTRIES``
+    and ``CULL_FREQUENCY`` apply to the shared tier.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._store = SQLiteStore(
+            location, self._max_entries, self._cull_frequency,
+            options.get("INVALIDATION_LOG_TTL", 600)
+        )
+        self._local_max = options.get("LOCAL_MAX_ENTRIES", 1000)
+        self._local_timeout = options.get("LOCAL_TIMEOUT", 60)
+        self._poll_interval = options.get("INVALIDATION_POLL_INTERVAL", 1)
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._seen = None
+        self._own = set()
+        self._polled = 0
+
+    # In-process tier
+
+    def _remember(self, key, pickled, expires):
+        local_expires = time.time() + self._local_timeout
+        if expires is not None:
+            local_expires = min(local_expires, expires)
+        with self._lock:
+            self._lru[key] = (pickled, local_expires)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._local_max:
+                self._lru.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return entry[0]
+
+    def _forget(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._lru.pop(key, None)
+
+    def _wrote(self, ids):
+        with self._lock:
+            self._own.update(ids)
+
+    def _sync(self):
+        """Drop local entries other processes replaced since the last poll."""
+        now = time.monotonic()
+        if now - self._polled < self._poll_interval:
+            return
+        self._polled = now
+        if self._seen is None:
+            self._seen = self._store.last_message()
+            with self._lock:
+                self._lru.clear()
+            return
+        messages, missed = self._store.messages(self._seen)
+        with self._lock:
+            if missed:
+                self._lru.clear()
+            for message_id, key in messages:
+                if message_id in self._own:
+                    self._own.discard(message_id)
+                elif key is None:
+                    self._lru.clear()
+                else:
+                    self._lru.pop(key, None)
+            if messages:
+                self._seen = messages[-1][0]
+
+    # Cache API
+
+    def _expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return None if expires is None else float(expires)
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        keys = {self.make_key(key, version=version): key for key in keys}
+        for key in keys:
+            self.validate_key(key)
+        found = {}
+        for key, original in keys.items():
+            pickled = self._recall(key)
+            if pickled is not None:
+                found[original] = pickle.loads(pickled)
+        missing = [key for key, original in keys.items()
+                   if original not in found]
+        for key, (pickled, expires) in self._store.mget(missing).items():
+            self._remember(key, pickled, expires)
+            found[keys[key]] = pickle.loads(pickled)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expires(timeout)
+        mapping = {}
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            mapping[key] = (pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                            expires)
+        if mapping:
+            self._wrote(self._store.mset(mapping))
+            for key, (pickled, expires) in mapping.items():
+                self._remember(key, pickled, expires)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self._expires(timeout)
+        stored, ids = self._store.set(key, pickled, expires, nx=True)
+        self._wrote(ids)
+        if stored:
+            self._remember(key, pickled, expires)
+        return stored
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        touched, ids = self._store.expire(key, self._expires(timeout))
+        self._wrote(ids)
+        self._forget(key)
+        return touched
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        for key in keys:
+            self.validate_key(key)
+        if keys:
+            self._wrote(self._store.delete(*keys)[1])
+            self._forget(*keys)
+
+    def has_key(self, key, version=None):
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    def clear(self):
+        self._wrote(self._store.flushdb())
+        with self._lock:
+            self._lru.clear()
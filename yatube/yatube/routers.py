@@ -0,0 +1,93 @@
+"""Primary/replica routing with read-your-writes pinning.
+
+``ReplicaMiddleware`` sends the ORM reads of ``REPLICA_VIEWS`` GET
+requests to a random alias of ``DATABASE_REPLICAS``; every other request,
+and every write, uses ``default``. A request that wrote to the primary
+sets a cookie that keeps the browser on the primary for
+``REPLICA_PIN_SECONDS``, long enough for replicas to catch up, so users
+always see their own posts, comments and follows. Values cached from a
+replica read go through ``cache_key`` and ``cache_timeout``.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+PIN_COOKIE = "pin_primary"
+
+_state = threading.local()
+
+
+def current_replica():
+    """The replica serving the reads of the current request, if any."""
+    return getattr(_state, "replica", None)
+
+
+def cache_key(key):
+    """Key to cache a value read in the current request under.
+
+    A replica may be behind the versions a key is built from, so what was
+    read from one is kept apart from what was read from the primary, which
+    pinned browsers must see.
+    """
+    replica = current_replica()
+    return key if replica is None else f"{key}-{replica}"
+
+
+def cache_timeout(timeout):
+    """Cap ``timeout`` at ``REPLICA_PIN_SECONDS`` for replica reads, by
+    when the replica has caught up."""
+    if current_replica() is None:
+        return timeout
+    return min(timeout, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    """Whether the browser wrote recently and must see fresh data."""
+    return PIN_COOKIE in request.COOKIES
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica, _state.wrote = None, False
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = _state.wrote
+            _state.replica, _state.wrote = None, False
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in ("GET", "HEAD")
+            and not is_pinned(request)
+            and match is not None
+            and match.view_name in settings.REPLICA_VIEWS
+        ):
+            _state.replica = random.choice(settings.DATABASE_REPLICAS)
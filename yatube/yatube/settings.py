@@ -10,7 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,6 +53,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "posts.metrics.MetricsMiddleware",
+    "yatube.routers.ReplicaMiddleware",
+    "posts.page_cache.AnonymousPageCacheMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,7 +69,7 @@ ROOT_URLCONF = "yatube.urls"
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "posts.metrics.MetricsTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -84,12 +91,43 @@ WSGI_APPLICATION = "yatube.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "yatube.sqlite",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "CONN_MAX_AGE": 60,
+        "OPTIONS": {
+            "timeout": 5,
+            "transaction_mode": "IMMEDIATE",
+            "busy_retries": 5,
+            "busy_backoff": 0.05,
+            "pragmas": {
+                "journal_mode": "wal",
+                "synchronous": "normal",
+                "mmap_size": 256 * 1024 * 1024,
+                "cache_size": -20000,
+                "temp_store": "memory",
+            },
+        },
     }
 }
 
 
+# Read replicas (yatube.routers). Locally they are copies of the primary
+# refreshed by the sync_replicas command: run with YATUBE_REPLICAS=2.
+DATABASE_REPLICAS = []
+for number in range(1, int(os.environ.get("YATUBE_REPLICAS", 0)) + 1):
+    DATABASE_REPLICAS.append(f"replica{number}")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "NAME": os.path.join(BASE_DIR, f"db-replica{number}.sqlite3"),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["yatube.routers.PrimaryReplicaRouter"]
+# View names (with namespace) of the GET views that may read from a replica
+REPLICA_VIEWS = ("index", "group_posts", "profile", "post", "follow_index")
+# How long a browser reads from the primary after it wrote something
+REPLICA_PIN_SECONDS = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -140,8 +178,106 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 
+# Two tiers (yatube.cache): a per-process LRU in front of a SQLite file all
+# workers share, with invalidations polled from the shared file
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.cache.TwoTierCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'LOCAL_MAX_ENTRIES': 5000,
+            'LOCAL_TIMEOUT': 60,
+            'INVALIDATION_POLL_INTERVAL': 1,
+        },
     }
 }
+
+# Groups and authors resolved from feed URLs (posts.lookups)
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+
+
+# Materialized follow timelines (posts.timeline)
+
+TIMELINE_FANOUT_BATCH_SIZE = 500
+# Authors with more followers are not fanned out on write, their posts are
+# merged into the follow feed at read time instead.
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_LIMIT = 500
+TIMELINE_CELEBRITY_CACHE_TIMEOUT = 60
+
+# Deepest page reachable through legacy ``?page=N`` links (posts.paginator)
+PAGINATOR_MAX_PAGE = 100
+
+# Page links shown on each side of the current page (posts.paginator)
+PAGINATOR_WINDOW = 2
+
+# Admin changelists estimate or cap row counts above this many rows, and
+# cache them (posts.admin)
+ADMIN_COUNT_THRESHOLD = 10000
+ADMIN_COUNT_CACHE_TIMEOUT = 60
+
+# Post id lists of feed pages (posts.feed_cache), invalidated on write
+FEED_CACHE_TIMEOUT = 60 * 5
+
+# Whole pages served to anonymous readers and shared page shells for
+# logged-in ones (posts.page_cache, posts.holes), purged through the feed
+# versions they were rendered at. View names with namespace: HTML views
+# only, the API sets its own validators.
+PAGE_CACHE_VIEWS = ("index", "group_posts", "profile", "post")
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Single-flight rebuilds of cached feed pages (posts.stampede): how long
+# stale pages are kept and served during a rebuild, how long the rebuild
+# lock is held at most and how eagerly pages are refreshed before expiry
+STAMPEDE_STALE_TIMEOUT = 60 * 5
+STAMPEDE_LOCK_TIMEOUT = 10
+STAMPEDE_WAIT_INTERVAL = 0.05
+STAMPEDE_BETA = 1.0
+
+# Rendered post cards (posts.templatetags.post_cards)
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Thumbnails generated in the background after upload (posts.thumbnails),
+# name -> (geometry, options) as passed to sorl's get_thumbnail
+THUMBNAIL_PRESETS = {
+    "card": ("960x339", {"crop": "center", "upscale": True}),
+}
+THUMBNAIL_WORKERS = 2
+# Generate in the thread that commits the post instead of the pool
+THUMBNAIL_SYNC = False
+
+# Objects per page of the JSON API lists (posts.api)
+API_PAGE_SIZE = 20
+
+# Request metrics served at /metrics (posts.metrics), shared by the worker
+# processes of a host through this SQLite file
+METRICS_DB = os.path.join(BASE_DIR, "metrics.sqlite3")
+METRICS_FLUSH_INTERVAL = 5
+
+# Statements slower than this many seconds are logged with their query plan
+# (posts.slow_queries), None turns the log off
+SLOW_QUERY_THRESHOLD = 0.1
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, "slow_queries.jsonl")
+SLOW_QUERY_WATCHED_TABLES = ("posts_post", "posts_follow", "posts_comment")
+
+# "Who to follow" suggestions (posts.recommendations): how many are stored
+# and shown per reader, the weight of co-follows against friends of
+# friends and how many readers are scored per batch
+FOLLOW_SUGGESTIONS = 20
+FOLLOW_SUGGESTIONS_SHOWN = 5
+FOLLOW_SUGGESTIONS_COFOLLOW_WEIGHT = 0.5
+FOLLOW_SUGGESTIONS_BATCH_SIZE = 1000
+
+# Test runs get files of their own instead of the ones running workers
+# share, a cache.clear() in a test must not wipe the live cache
+TESTING = sys.argv[1:2] == ["test"] or "pytest" in sys.modules
+if TESTING:
+    TEST_FILES_DIR = tempfile.mkdtemp(prefix="yatube-test-")
+    atexit.register(shutil.rmtree, TEST_FILES_DIR, ignore_errors=True)
+    CACHES["default"]["LOCATION"] = os.path.join(
+        TEST_FILES_DIR, "cache.sqlite3"
+    )
+    METRICS_DB = os.path.join(TEST_FILES_DIR, "metrics.sqlite3")
+    MEDIA_ROOT = os.path.join(TEST_FILES_DIR, "media")
+    THUMBNAIL_SYNC = True
@@ -0,0 +1,72 @@
+"""SQLite backend tuned for a multi-process web server.
+
+Extra ``OPTIONS`` on top of the ones ``sqlite3.connect`` accepts:
+
+``pragmas``
+    ``{name: value}`` applied to every new connection, e.g. WAL journaling
+    so readers never wait for a writer.
+``transaction_mode``
+    ``"IMMEDIATE"`` takes the write lock when an atomic block starts. A
+    deferred transaction that reads first and then writes cannot wait for
+    the lock and fails with ``database is locked`` at once.
+``busy_retries`` and ``busy_backoff``
+    How often and after how many seconds (doubling each time) a statement
+    that still finds the database locked after ``timeout`` is retried. Only
+    statements that start a transaction or run in autocommit mode are
+    retried, others would repeat part of a transaction.
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+from django.db.utils import OperationalError
+
+EXTRA_OPTIONS = {
+    "pragmas": {},
+    "transaction_mode": None,
+    "busy_retries": 0,
+    "busy_backoff": 0.05,
+}
+
+
+def is_busy(error):
+    return "database is locked" in str(error)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.extra_options = dict(EXTRA_OPTIONS)
+        self.execute_wrappers.append(self._retry_busy)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.extra_options = {
+            name: params.pop(name, default)
+            for name, default in EXTRA_OPTIONS.items()
+        }
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.extra_options["pragmas"].items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.extra_options["transaction_mode"]
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
+
+    def _retry_busy(self, execute, sql, params, many, context):
+        retries = self.extra_options["busy_retries"]
+        delay = self.extra_options["busy_backoff"]
+        for attempt in range(retries + 1):
+            try:
+                return execute(sql, params, many, context)
+            except OperationalError as error:
+                retryable = (
+                    sql.startswith("BEGIN") or not self.in_atomic_block
+                )
+                if attempt == retries or not retryable or not is_busy(error):
+                    raise
+            time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
@@ -27,6 +27,7 @@ handler500 = "yatube.views.server_error"  # noqa
 urlpatterns = [
     path("auth/", include("users.urls")),
     path("auth/", include("django.contrib.auth.urls")),
+    path("api/v1/", include("posts.api_urls")),
     path("", include("posts.urls")),
     path("admin/admin/", admin.site.urls),
     path("about/", include("about.urls", namespace="about")),